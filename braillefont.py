@@ -0,0 +1,142 @@
+"""
+braillefont.py -- Paul Cobbaut, 2026-10-17
+The Braille alphabet shared by braille.py, lockers.py and dovetail.py
+Every character is compiled once into a 6 bit mask (bit 0 is dot 1, bit 5 is dot 6),
+a whole string is turned into cell positions and masks with numpy, number indicators included,
+brailleglyphs.py builds every cell from the dot positions of cell_dots
+"""
+
+import numpy as np
+
+# position of Braille dots
+"""
+14
+25
+36
+"""
+
+# Braille alphabet
+# List of supported characters
+"""
+a 	⠁ 	1
+b 	⠃ 	12
+c 	⠉ 	14
+d 	⠙ 	145
+e 	⠑ 	15
+f 	⠋ 	124
+g 	⠛ 	1245
+h 	⠓ 	125
+i 	⠊ 	24
+j 	⠚ 	245
+k 	⠅ 	13
+l 	⠇ 	123
+m 	⠍ 	134
+n 	⠝ 	1345
+o 	⠕ 	135
+p 	⠏ 	1234
+q 	⠟ 	12345
+r 	⠗ 	1235
+s 	⠎ 	234
+t 	⠞ 	2345
+u 	⠥ 	136
+v 	⠧ 	1236
+w 	⠺ 	2456
+x 	⠭ 	1346
+y 	⠽ 	13456
+z 	⠵ 	1356
+number indicator 	⠼ 	3456
+1 	⠼⠁ 	3456 1
+2 	⠼⠃ 	3456 12
+3 	⠼⠉ 	3456 14
+4 	⠼⠙ 	3456 145
+5 	⠼⠑ 	3456 15
+6 	⠼⠋ 	3456 124
+7 	⠼⠛ 	3456 1245
+8 	⠼⠓ 	3456 125
+9 	⠼⠊ 	3456 24
+0 	⠼⠚ 	3456 245
+"""
+
+# dictionary character : dots printed
+braille = {
+  "a" : "1",
+  "b" : "12",
+  "c" : "14",
+  "d" : "145",
+  "e" : "15",
+  "f" : "124",
+  "g" : "1245",
+  "h" : "125",
+  "i" : "24",
+  "j" : "245",
+  "k" : "13",
+  "l" : "123",
+  "m" : "134",
+  "n" : "1345",
+  "o" : "135",
+  "p" : "1234",
+  "q" : "12345",
+  "r" : "1235",
+  "s" : "234",
+  "t" : "2345",
+  "u" : "136",
+  "v" : "1236",
+  "w" : "2456",
+  "x" : "1346",
+  "y" : "13456",
+  "z" : "1356",
+  "1" : "1",
+  "2" : "12",
+  "3" : "14",
+  "4" : "145",
+  "5" : "15",
+  "6" : "124",
+  "7" : "1245",
+  "8" : "125",
+  "9" : "24",
+  "0" : "245",
+  " " : "",
+  "-" : "36"
+}
+
+
+# turns dots printed ("3456") into a 6 bit mask
+def dots_to_mask(dots):
+    mask = 0
+    for dot in dots:
+        mask |= 1 << (int(dot) - 1)
+    return mask
+
+
+# character : mask, compiled once
+masks = {char: dots_to_mask(dots) for char, dots in braille.items()}
+
+# Braille Number Indicator = "3456", put in front of the first digit of a number
+number_indicator = dots_to_mask("3456")
+
+# (dx, dy) in dot separations of Braille dot 1 to 6, row 0
+# dx is 0 for the 123 dots on the left and 1 for the 456 dots on the right,
+# dy is 2 for the top dots 1 and 4 down to 0 for the bottom dots 3 and 6
+dot_offsets = np.array([(0, 2), (0, 1), (0, 0), (1, 2), (1, 1), (1, 0)])
+
+
+# every Braille cell of string, a number indicator takes the cell in front of a number
+# returns the cell positions (the first character is at 1) and their masks as numpy arrays
+def string_to_cells(string):
+    if string == "":
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    digit = np.array([char.isdigit() for char in string])
+    starts = digit & ~np.concatenate(([False], digit[:-1]))
+    # every number indicator shifts the rest of the string one cell to the right
+    positions = np.arange(1, len(string) + 1) + np.cumsum(starts)
+    cellmasks = np.array([masks[char] for char in string])
+    positions = np.concatenate((positions, positions[starts] - 1))
+    cellmasks = np.concatenate((cellmasks, np.full(np.count_nonzero(starts), number_indicator)))
+    order = np.argsort(positions, kind="stable")
+    return positions[order], cellmasks[order]
+
+
+# the x, y of the dots of one cell, relative to dot 3 of that cell
+def cell_dots(mask, dot_separation):
+    bits = np.nonzero((int(mask) >> np.arange(6)) & 1)[0]
+    return dot_offsets[bits] * dot_separation
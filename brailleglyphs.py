@@ -0,0 +1,53 @@
+"""
+brailleglyphs.py -- Paul Cobbaut, 2026-10-17
+Braille cells as FreeCAD shapes for braille.py, lockers.py and dovetail.py
+There are only 64 different cells: each one is built once as a compound of dots and then
+placed for every character that uses it, so a line costs one object per character, not per dot
+"""
+
+import FreeCAD
+from FreeCAD import Base, Vector
+import Part
+import braillefont
+
+# every dot and every cell that was built, kept for all lines, labels and documents
+# a cell is keyed by (mask, dot_size, dot_separation), a dot by ("dot", dot_size)
+glyph_cache = {}
+
+
+# the same half sphere as the template dot: a Part::Sphere with Angle3 = 180, turned (180, 0, 90)
+def make_dot(dot_size):
+    dot = Part.makeSphere(dot_size, Vector(0, 0, 0), Vector(0, 0, 1), -90, 90, 180)
+    dot.Placement = FreeCAD.Placement(Vector(0, 0, 0), FreeCAD.Rotation(180, 0, 90))
+    return dot
+
+
+# the shape of one Braille cell, dot 3 is at (0, 0)
+def glyph_shape(mask, dot_size, dot_separation):
+    key = (int(mask), dot_size, dot_separation)
+    if key not in glyph_cache:
+        if ("dot", dot_size) not in glyph_cache:
+            glyph_cache[("dot", dot_size)] = make_dot(dot_size)
+        dot = glyph_cache[("dot", dot_size)]
+        glyph_cache[key] = Part.makeCompound([dot.translated(Vector(x, y, 0)) for x, y in braillefont.cell_dots(mask, dot_separation).tolist()])
+    return glyph_cache[key]
+
+
+# one Braille string as a Part::Compound called name, with one Part::Feature per character
+# the line is line_separation below the previous one, z lifts it onto a surface
+def place_braille_string(doc, name, string, line_count, dot_size, dot_separation, char_separation, line_separation, z=0):
+    compound_list = []
+    positions, cellmasks = braillefont.string_to_cells(string)
+    for char_count, mask in zip(positions.tolist(), cellmasks.tolist()):
+        if mask == 0:
+            continue
+        obj = doc.addObject('Part::Feature', 'cell')
+        obj.Shape = glyph_shape(mask, dot_size, dot_separation)
+        obj.Label = "cell_" + str(line_count) + "_" + str(char_count)	# name has 'some' meaning: cell + line + character position
+        position = Vector(char_count * char_separation, - line_separation * line_count, z)
+        obj.Placement = FreeCAD.Placement(position, FreeCAD.Rotation(0, 0, 0))
+        compound_list.append(obj)
+    obj = doc.addObject("Part::Compound", name)
+    obj.Links = compound_list
+    doc.recompute()	# This seems needed, otherwise nothing appears in FreeCAD
+    return obj
@@ -0,0 +1,85 @@
+"""
+brick_dimensions.py -- Paul Cobbaut, 2026-10-17
+Dimensions of Lego-compatible bricks in mm, for brick_freecad.py and brickmesh.py
+"""
+import math
+
+# Dimensions for studs
+stud_radius_mm		= 2.471
+stud_center_spacing_mm	= 8.000
+stud_height_mm		= 1.700
+
+# Dimensions for plates
+plate_height_mm		= 3.200
+plate_width_mm		= 7.800		# for 1x1 plate and 1x1 brick
+
+# The gap that is added to the width/lenght for each extra stud
+gap_mm 			= 0.200		# extra thickness needed between each two studs
+
+# Dimensions for bricks
+brick_height_mm		= 9.600		# plate_height_mm * 3
+brick_wall_thickness_mm	= 1.600	
+brick_width_mm		= 7.800		# = plate_width_mm
+
+# Dimensions for bricks: underside standard Lego-compatible brick
+cylinder_radius_outer_mm = 3.226	# 3.256?
+cylinder_radius_inner_mm = 2.370	# 2.400?
+cylinder_height_mm 	= 8.000
+
+
+# width in mm of a brick that is y studs wide
+def calculate_width(y):
+    w = (y * (brick_width_mm + gap_mm)) - gap_mm
+    return w
+
+
+# the hole in the centre of a brick with studs_side studs around it, as (x0, y0, x1, y1)
+def centre_hole(xstuds, ystuds, studs_side):
+    start = studs_side * (brick_width_mm + gap_mm)
+    return (start, start, start + calculate_width(xstuds - 2 * studs_side), start + calculate_width(ystuds - 2 * studs_side))
+
+
+# the (x, y) centre of every stud, studs_side > 0 leaves out the studs above the hole
+def stud_positions(xstuds, ystuds, studs_side=0):
+    hole = centre_hole(xstuds, ystuds, studs_side) if studs_side > 0 else None
+    positions = []
+    for i in range(int(xstuds)):
+        for j in range(int(ystuds)):
+            cx = (i + 0.5) * stud_center_spacing_mm
+            cy = (j + 0.5) * stud_center_spacing_mm
+            if hole is None or not (hole[0] < cx < hole[2] and hole[1] < cy < hole[3]):
+                positions.append((cx, cy))
+    return positions
+
+
+# the (x, y) centre of every underside tube, studs_side > 0 leaves out the tubes that would reach into the hole
+def tube_positions(xstuds, ystuds, studs_side=0):
+    hole = centre_hole(xstuds, ystuds, studs_side) if studs_side > 0 else None
+    positions = []
+    for j in range(int(xstuds - 1)):
+        for i in range(int(ystuds - 1)):
+            cx = (brick_width_mm + gap_mm) * (j + 1)
+            cy = (brick_width_mm + gap_mm) * (i + 1)
+            if hole is not None:
+                # distance from the tube centre to the hole
+                dx = max(hole[0] - cx, 0, cx - hole[2])
+                dy = max(hole[1] - cy, 0, cy - hole[3])
+                if math.hypot(dx, dy) < cylinder_radius_outer_mm:
+                    continue
+            positions.append((cx, cy))
+    return positions
+
+
+# every brick with a hole up to x_max by y_max studs, for a border of studs_side studs out of sides
+# a brick is always named shortest side x longest side, so only x <= y is made,
+# x must be at least 3 and the hole must be at least one stud wide
+# returns the list of (x, y, studs_side), cheapest first: fewest studs and tubes
+def hole_catalogue(x_max, y_max, sides):
+    jobs = set()
+    for x in range(3, int(x_max) + 1):
+        for y in range(3, int(y_max) + 1):
+            for studs_side in sides:
+                x_short, y_long = min(x, y), max(x, y)
+                if studs_side >= 1 and x_short - 2 * studs_side >= 1:
+                    jobs.add((x_short, y_long, studs_side))
+    return sorted(jobs, key=lambda job: (job[0] * job[1] + (job[0] - 1) * (job[1] - 1), job))
@@ -4,28 +4,35 @@ The goal is to make nonexisting Lego-compatible pieces for use in 3D printer
 The script is able to generate .stl files directly.
 currently abandoned...
 """
-# Dimensions for studs
-stud_radius_mm		= 2.471
-stud_center_spacing_mm	= 8.000
-stud_height_mm		= 1.700
+# all dimensions are in brick_dimensions.py, shared with brickmesh.py
+from brick_dimensions import *
 
-# Dimensions for plates
-plate_height_mm		= 3.200
-plate_width_mm		= 7.800		# for 1x1 plate and 1x1 brick
+# .stl files are written here
+export_directory = "/home/paul/FreeCAD models/brick_python/"
 
-# The gap that is added to the width/lenght for each extra stud
-gap_mm 			= 0.200		# extra thickness needed between each two studs
+# booleans of create_brick_series_with_hole
+hole_aware_shell = True		# build the brick around the hole from boxes, no booleans at all
+boolean_general_fuse = True	# without hole_aware_shell: one general fuse of brick, hole and wall instead of cut, cut and fuse
+boolean_fuzzy_mm = 0.0001	# fuzzy tolerance, faces closer than this count as coincident
 
-# Dimensions for bricks
-brick_height_mm		= 9.600		# plate_height_mm * 3
-brick_wall_thickness_mm	= 1.600	
-brick_width_mm		= 7.800		# = plate_width_mm
-
-# Dimensions for bricks: underside standard Lego-compatible brick
-cylinder_radius_outer_mm = 3.226	# 3.256?
-cylinder_radius_inner_mm = 2.370	# 2.400?
-cylinder_height_mm 	= 8.000
+# calibration plate: one coupler for every combination of these values, the rest is brick_dimensions.py
+calibration_values = {
+    "stud_radius_mm": (2.400, 2.450, 2.471, 2.500),		# Lego official, Lego-Windows/windows.py, brick_dimensions.py
+    "cylinder_radius_outer_mm": (3.200, 3.226, 3.256),	# brick_dimensions.py and its "3.256?"
+    "gap_mm": (0.100, 0.200, 0.300),
+}
+calibration_studs = 2		# a coupler is calibration_studs x calibration_studs studs and one plate high
+calibration_spacing_mm = 4.0	# free space between two couplers on the print plate
+calibration_clearance_mm = 0.1	# room above a stud of the coupler below, so two couplers seat fully
+label_font = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+label_size_mm = 4.0		# height of the letters of a label
+label_tab_mm = 0.8		# thickness of the tab in front of a coupler that carries its label
+label_relief_mm = 0.6		# the letters stand this high on the tab
 
+import itertools
+import math
+import os
+import time
 import FreeCAD
 from FreeCAD import Base, Vector
 import Part
@@ -36,10 +43,6 @@ import Mesh
 doc = FreeCAD.newDocument("Lego brick generated")
 obj = doc.addObject("PartDesign::Body", "Body")
 
-def calculate_width(y):
-    w = (y * (brick_width_mm + gap_mm)) - gap_mm
-    return w
-
 def make_prism(name, x, y, z):
     obj = doc.addObject("Part::Box", name)
     obj.Length = x
@@ -90,6 +93,43 @@ def create_studs(name, compound_list, x, y, z):
             compound_list.append(obj)
 
 
+# all studs of a plate as one shape, not one document object per stud
+# one stud is placed xstuds times to make a row, the row is placed ystuds times,
+# the copies share the geometry of the first stud so even 48x48 studs are fast
+def make_stud_grid(xstuds, ystuds, z):
+    row = make_stud_row(xstuds, z)
+    return Part.makeCompound([row.translated(Vector(0, j * stud_center_spacing_mm, 0)) for j in range(int(ystuds))])
+
+
+# the first row of studs (along x) as one shape
+def make_stud_row(xstuds, z):
+    first = stud_center_spacing_mm / 2
+    stud = Part.makeCylinder(stud_radius_mm, stud_height_mm, Vector(first, first, z))
+    return Part.makeCompound([stud.translated(Vector(i * stud_center_spacing_mm, 0, 0)) for i in range(int(xstuds))])
+
+
+# a flat plate of plate_height_mm with studs, as a single document object
+def create_baseplate(platename, xstuds, ystuds, offset):
+    width = calculate_width(xstuds)
+    length = calculate_width(ystuds)
+    plate = Part.makeBox(width, length, plate_height_mm)
+    obj = doc.addObject("Part::Feature", platename)
+    obj.Shape = Part.makeCompound([plate, make_stud_grid(xstuds, ystuds, plate_height_mm)])
+    obj.Placement = FreeCAD.Placement(Vector((brick_width_mm * offset), 0, 0), FreeCAD.Rotation(0,0,0), Vector(0,0,0))
+    return obj
+
+
+def export_baseplate(xstuds, ystuds):
+    start = time.time()
+    plate_name = "baseplate_" + str(xstuds) + 'x' + str(ystuds)
+    plate = create_baseplate(plate_name, xstuds, ystuds, 0)
+    doc.recompute()
+    export = []
+    export.append(plate)
+    Mesh.export(export, export_directory + plate_name + ".stl")
+    print(plate_name, "exported in", round(time.time() - start, 2), "seconds")
+
+
 def create_a_flat_bottom_brick(brickname, xstuds, ystuds, offset):
     compound_list = []
     width = calculate_width(xstuds)
@@ -166,7 +206,7 @@ def create_brick_series(studs_x, studs_y_max):
         doc.recompute()
         export = []
         export.append(doc.getObject(brick_name))
-        Mesh.export(export, u"/home/paul/FreeCAD models/brick_python/" + brick_name + ".stl")
+        Mesh.export(export, export_directory + brick_name + ".stl")
 
 def create_wall(studs_x, studs_y, studs_side, offset):
     width = calculate_width(studs_x)
@@ -183,13 +223,148 @@ def create_wall(studs_x, studs_y, studs_side, offset):
     return wall
 
 
-def create_brick_series_with_hole(studs_x, studs_y_max, studs_side):
+# the underside cylinder as a shape, only this one is cut
+def make_tube():
+    outer_cylinder = Part.makeCylinder(cylinder_radius_outer_mm, cylinder_height_mm)
+    inner_cylinder = Part.makeCylinder(cylinder_radius_inner_mm, cylinder_height_mm)
+    return outer_cylinder.cut(inner_cylinder)
+
+
+# ceiling and walls of a brick as five boxes that touch but never overlap:
+# the ceiling over the whole brick, the side walls under it along y and the end walls between the side walls
+def make_brick_shell(xstuds, ystuds):
+    width = calculate_width(xstuds)
+    length = calculate_width(ystuds)
+    wall = brick_wall_thickness_mm
+    wall_height = brick_height_mm - wall
+    return [
+        Part.makeBox(width, length, wall, Vector(0, 0, wall_height)),
+        Part.makeBox(wall, length, wall_height, Vector(0, 0, 0)),
+        Part.makeBox(wall, length, wall_height, Vector(width - wall, 0, 0)),
+        Part.makeBox(width - 2 * wall, wall, wall_height, Vector(wall, 0, 0)),
+        Part.makeBox(width - 2 * wall, wall, wall_height, Vector(wall, length - wall, 0)),
+    ]
+
+
+# the same bricks as create_brick_series, but every length is the previous length plus one row
+# of studs and one row of underside cylinders, copies of one stud and one tube that share their geometry
+# only the five boxes of the shell are made again for every length, so nothing is cut or built again,
+# a long series grows linearly and every exported brick is one flat compound without overlapping solids
+def create_brick_series_incremental(studs_x, studs_y_max):
+    start = time.time()
     offset = 0
-    for i in range(int(studs_x), int(studs_y_max) + 1):
-        brick_name = "brick_with_hole_" + str(studs_x) + 'x' + str(i) + '_border_' + str(studs_side)
-        brick = create_brick_with_hole(brick_name, studs_x, i, offset, studs_side)
-        wall_name = "wall_" + str(studs_x) + 'x' + str(i)
-        wall = create_wall(studs_x - (2*studs_side), i - (2*studs_side), studs_side, offset)
+    stud = Part.makeCylinder(stud_radius_mm, stud_height_mm, Vector(0, 0, brick_height_mm))
+    tube = make_tube()
+    studs = []
+    tubes = []
+    for i in range(1, int(studs_y_max) + 1):
+        cy = (i - 0.5) * stud_center_spacing_mm
+        studs += [stud.translated(Vector((j + 0.5) * stud_center_spacing_mm, cy, 0)) for j in range(int(studs_x))]
+        if i > 1:
+            cy = (brick_width_mm + gap_mm) * (i - 1)
+            tubes += [tube.translated(Vector((brick_width_mm + gap_mm) * (j + 1), cy, 0)) for j in range(int(studs_x - 1))]
+        if i < studs_x:
+            continue
+        brick_name = "brick_" + str(studs_x) + 'x' + str(i)
+        brick = doc.addObject("Part::Feature", brick_name)
+        brick.Shape = Part.makeCompound(make_brick_shell(studs_x, i) + studs + tubes)
+        brick.Placement = FreeCAD.Placement(Vector((brick_width_mm * offset), 0, 0), FreeCAD.Rotation(0,0,0), Vector(0,0,0))
+        offset = offset + int(studs_x) + 1
+        export = []
+        export.append(brick)
+        Mesh.export(export, export_directory + brick_name + ".stl")
+    print("brick series", studs_x, "x", studs_y_max, "exported in", round(time.time() - start, 2), "seconds")
+
+
+# a box between two rectangles (x0, y0, x1, y1) from z0 to z1, as four boxes
+def make_frame(outer, inner, z0, z1):
+    x0, y0, x1, y1 = outer
+    a0, b0, a1, b1 = inner
+    height = z1 - z0
+    return Part.makeCompound([
+        Part.makeBox(x1 - x0, b0 - y0, height, Vector(x0, y0, z0)),
+        Part.makeBox(x1 - x0, y1 - b1, height, Vector(x0, b1, z0)),
+        Part.makeBox(a0 - x0, b1 - b0, height, Vector(x0, b0, z0)),
+        Part.makeBox(x1 - a1, b1 - b0, height, Vector(a1, b0, z0)),
+    ])
+
+
+# a brick with a hole built with knowledge of the hole: the ceiling is a frame around it,
+# the wall around the hole is part of the shell and studs and tubes above or in the hole are never made,
+# so there is nothing left to cut and the brick is one compound without any boolean
+def make_brick_with_hole(studs_x, studs_y, studs_side):
+    width = calculate_width(studs_x)
+    length = calculate_width(studs_y)
+    wall = brick_wall_thickness_mm
+    ceiling = brick_height_mm - wall
+    outer = (0, 0, width, length)
+    hole = centre_hole(studs_x, studs_y, studs_side)
+    around = (hole[0] - wall, hole[1] - wall, hole[2] + wall, hole[3] + wall)
+    shell = [
+        make_frame(outer, hole, ceiling, brick_height_mm),
+        make_frame(outer, (wall, wall, width - wall, length - wall), 0, ceiling),
+        make_frame(around, hole, 0, ceiling),
+    ]
+    stud = Part.makeCylinder(stud_radius_mm, stud_height_mm, Vector(0, 0, brick_height_mm))
+    studs = [stud.translated(Vector(cx, cy, 0)) for cx, cy in stud_positions(studs_x, studs_y, studs_side)]
+    tube = make_tube()
+    tubes = [tube.translated(Vector(cx, cy, 0)) for cx, cy in tube_positions(studs_x, studs_y, studs_side)]
+    return Part.makeCompound(shell + studs + tubes)
+
+
+def create_brick_with_hole_shell(brick_name, studs_x, studs_y, offset, studs_side):
+    obj = doc.addObject("Part::Feature", brick_name)
+    obj.Shape = make_brick_with_hole(studs_x, studs_y, studs_side)
+    obj.Placement = FreeCAD.Placement(Vector((brick_width_mm * offset), 0, 0), FreeCAD.Rotation(0,0,0), Vector(0,0,0))
+    return obj
+
+
+# brick - hole - wall + wall as one general fuse: every solid is split once against all others,
+# a fragment shared by two arguments is the same shape in both lists of the result, isSame finds it
+# the solid is sewn from the faces of the kept fragments, a face that two of them share is inside it
+# Shape.generalFuse ends up in TopoShape::generalFuse (src/Mod/Part/App/TopoShape.cpp),
+# which calls SetRunParallel(true) on the OCC builder, the Python API has no switch for it
+def fuse_brick_with_hole(brick_name, studs_x, studs_y, offset, studs_side):
+    brick = create_a_brick("brick" + str(studs_x) + '_' + str(studs_y), studs_x, studs_y, offset)
+    hole = create_a_hole("hole_in" + str(studs_x) + '_' + str(studs_y), studs_x - 2 * studs_side, studs_y - 2 * studs_side, offset, studs_side)
+    wall = create_wall(studs_x - (2*studs_side), studs_y - (2*studs_side), studs_side, offset)
+    doc.recompute()
+    shapes = [obj.Shape for obj in (brick, hole, wall)]
+    result, pieces = shapes[0].generalFuse(shapes[1:], boolean_fuzzy_mm)
+    keep = [piece for piece in pieces[0] if not any(piece.isSame(other) for other in pieces[1] + pieces[2])] + pieces[2]
+    # hashCode only sorts the faces into buckets, isSame decides which of them are one face
+    buckets = {}
+    for face in [face for piece in keep for face in piece.Faces]:
+        bucket = buckets.setdefault(face.hashCode(), [])
+        same = [entry for entry in bucket if entry[0].isSame(face)]
+        if same:
+            same[0][1] += 1
+        else:
+            bucket.append([face, 1])
+    faces = [face for bucket in buckets.values() for face, uses in bucket if uses == 1]
+    obj = doc.addObject("Part::Feature", brick_name)
+    obj.Shape = Part.Solid(Part.Shell(faces))
+    for part in (brick, hole, wall):
+        part.ViewObject.hide()
+    return obj
+
+
+def hole_brick_name(studs_x, studs_y, studs_side):
+    return "brick_with_hole_" + str(studs_x) + 'x' + str(studs_y) + '_border_' + str(studs_side)
+
+
+# one brick with a hole written to .stl, returns the seconds it took
+def export_brick_with_hole(studs_x, studs_y, studs_side, offset):
+    start = time.time()
+    brick_name = hole_brick_name(studs_x, studs_y, studs_side)
+    if hole_aware_shell:
+        objfuse = create_brick_with_hole_shell(brick_name, studs_x, studs_y, offset, studs_side)
+    elif boolean_general_fuse:
+        objfuse = fuse_brick_with_hole(brick_name, studs_x, studs_y, offset, studs_side)
+    else:
+        brick = create_brick_with_hole(brick_name, studs_x, studs_y, offset, studs_side)
+        wall_name = "wall_" + str(studs_x) + 'x' + str(studs_y)
+        wall = create_wall(studs_x - (2*studs_side), studs_y - (2*studs_side), studs_side, offset)
         # cut with wall to remove remnant cylinders
         objcut = doc.addObject('Part::Cut', "objcut")
         objcut.Base = brick
@@ -201,11 +376,137 @@ def create_brick_series_with_hole(studs_x, studs_y_max, studs_side):
         objfuse.Base = objcut
         objfuse.Tool = wall
         objcut.ViewObject.hide()
+    doc.recompute()
+    export = []
+    export.append(objfuse)
+    Mesh.export(export, export_directory + brick_name + ".stl")
+    seconds = time.time() - start
+    print(brick_name, "in", round(seconds, 2), "seconds")
+    return seconds
+
+
+def create_brick_series_with_hole(studs_x, studs_y_max, studs_side):
+    offset = 0
+    timings = []
+    for i in range(int(studs_x), int(studs_y_max) + 1):
+        timings.append((hole_brick_name(studs_x, i, studs_side), export_brick_with_hole(studs_x, i, studs_side, offset)))
         offset = offset + int(studs_x) + 1
-        doc.recompute()
-        export = []
-        export.append(doc.getObject("objfuse"))
-        Mesh.export(export, u"/home/paul/FreeCAD models/brick_python/" + brick_name + ".stl")
+    print("shell" if hole_aware_shell else "general fuse" if boolean_general_fuse else "cut, cut, fuse", "total", round(sum(t for name, t in timings), 2), "seconds")
+    return timings
+
+
+# every valid brick with a hole up to x_max by y_max studs and a border out of sides, see hole_catalogue
+# the cheapest bricks come first, skip_existing=True leaves a brick that is already in export_directory alone
+def create_brick_catalogue(x_max, y_max, sides=(1, 2, 3), skip_existing=False):
+    offset = 0
+    timings = []
+    for studs_x, studs_y, studs_side in hole_catalogue(x_max, y_max, sides):
+        brick_name = hole_brick_name(studs_x, studs_y, studs_side)
+        if skip_existing and os.path.exists(export_directory + brick_name + ".stl"):
+            continue
+        timings.append((brick_name, export_brick_with_hole(studs_x, studs_y, studs_side, offset)))
+        offset = offset + int(studs_x) + 1
+    print("catalogue:", len(timings), "bricks in", round(sum(t for name, t in timings), 2), "seconds")
+    return timings
+
+# one shape per key, so every coupler that shares a value shares that subshape instead of building it again
+calibration_shapes = {}
+
+
+def calibration_shape(key, make):
+    if key not in calibration_shapes:
+        calibration_shapes[key] = make()
+    return calibration_shapes[key]
+
+
+# the width of a coupler of calibration_studs for one gap, like calculate_width
+def coupler_width(gap):
+    return calibration_studs * (brick_width_mm + gap) - gap
+
+
+# the underside of a coupler is as high as a stud plus calibration_clearance_mm, the ceiling takes the rest of the plate
+def coupler_cavity():
+    return stud_height_mm + calibration_clearance_mm
+
+
+# the walls and ceiling of a coupler of calibration_studs, they only change with the gap
+def make_coupler_shell(gap):
+    width = coupler_width(gap)
+    wall = brick_wall_thickness_mm
+    cavity = coupler_cavity()
+    outer = (0, 0, width, width)
+    return Part.makeCompound([
+        Part.makeBox(width, width, plate_height_mm - cavity, Vector(0, 0, cavity)),
+        make_frame(outer, (wall, wall, width - wall, width - wall), 0, cavity),
+    ])
+
+
+def make_coupler_tube(radius_outer):
+    height = coupler_cavity()
+    return Part.makeCylinder(radius_outer, height).cut(Part.makeCylinder(cylinder_radius_inner_mm, height))
+
+
+# the label letters standing on a flat tab as wide as a coupler
+def make_label(text, width):
+    depth = label_size_mm + 2
+    tab = Part.makeBox(width, depth, label_tab_mm, Vector(0, -depth, 0))
+    letters = []
+    for char in Part.makeWireString(text, label_font, label_size_mm):
+        if char != []:
+            letters.append(Part.makeFace(char, "Part::FaceMakerBullseye").extrude(Vector(0, 0, label_relief_mm)))
+    return Part.makeCompound([tab] + [letter.translated(Vector(1, 1 - depth, label_tab_mm)) for letter in letters])
+
+
+# one coupler of calibration_studs x calibration_studs for one combination of calibration_values,
+# studs and tubes are placed around the centre on the stud_center_spacing_mm grid, the gap only changes the width
+def make_coupler(values, label):
+    gap = values["gap_mm"]
+    spacing = stud_center_spacing_mm
+    width = coupler_width(gap)
+    parts = [calibration_shape(("shell", gap), lambda: make_coupler_shell(gap))]
+    stud = calibration_shape(("stud", values["stud_radius_mm"]), lambda: Part.makeCylinder(values["stud_radius_mm"], stud_height_mm, Vector(0, 0, plate_height_mm)))
+    tube = calibration_shape(("tube", values["cylinder_radius_outer_mm"]), lambda: make_coupler_tube(values["cylinder_radius_outer_mm"]))
+    for i in range(calibration_studs):
+        for j in range(calibration_studs):
+            parts.append(stud.translated(Vector(width / 2 + (i - (calibration_studs - 1) / 2) * spacing, width / 2 + (j - (calibration_studs - 1) / 2) * spacing, 0)))
+    for i in range(calibration_studs - 1):
+        for j in range(calibration_studs - 1):
+            parts.append(tube.translated(Vector(width / 2 + (i - (calibration_studs - 2) / 2) * spacing, width / 2 + (j - (calibration_studs - 2) / 2) * spacing, 0)))
+    parts.append(make_label(label, width))
+    return Part.makeCompound(parts)
+
+
+# every combination of calibration_values as one coupler on a single print plate, labelled A1, A2, ...
+# a legend with the values of every label is printed and written next to the .stl
+# returns the legend as a list of (label, values)
+def create_calibration_plate():
+    start = time.time()
+    calibration_shapes.clear()
+    names = list(calibration_values)
+    variants = [dict(zip(names, combination)) for combination in itertools.product(*calibration_values.values())]
+    columns = math.ceil(math.sqrt(len(variants)))
+    pitch_x = coupler_width(max(calibration_values["gap_mm"])) + calibration_spacing_mm
+    pitch_y = pitch_x + label_size_mm + 2
+    couplers = []
+    legend = []
+    for n, values in enumerate(variants):
+        row, column = divmod(n, columns)
+        label = chr(ord('A') + row) + str(column + 1)
+        coupler = make_coupler(values, label)
+        couplers.append(coupler.translated(Vector(column * pitch_x, row * pitch_y + label_size_mm + 2, 0)))
+        legend.append((label, values))
+    obj = doc.addObject("Part::Feature", "calibration_plate")
+    obj.Shape = Part.makeCompound(couplers)
+    export = []
+    export.append(obj)
+    Mesh.export(export, export_directory + "calibration_plate.stl")
+    with open(export_directory + "calibration_plate.txt", "w") as f:
+        for label, values in legend:
+            line = label + "\t" + "\t".join(name + " = " + str(value) for name, value in values.items())
+            f.write(line + "\n")
+            print(line)
+    print(len(legend), "couplers from", len(calibration_shapes), "shared shapes in", round(time.time() - start, 2), "seconds")
+    return legend
 
 ### Example: to create single bricks
 #create_a_brick("brick_2x3", 2, 3, 0)
@@ -218,6 +519,18 @@ def create_brick_series_with_hole(studs_x, studs_y_max, studs_side):
 ### a 4x2 brick does not exist, it is a 3x4!
 ### create_brick_series(width, max_length)
 #create_brick_series(5, 42)
+### the same series, every brick grown from the one before it
+#create_brick_series_incremental(5, 42)
+
+### Example: a baseplate, the studs are one shape so 48x48 only takes seconds
+#export_baseplate(32, 32)
+#export_baseplate(48, 48)
+
+### Example: every brick with a hole up to 12x16 with a border of 1, 2 or 3 studs
+#create_brick_catalogue(12, 16, (1, 2, 3))
+
+### Example: one print plate with a coupler for every combination of calibration_values
+#create_calibration_plate()
 
 # create_brick_series_with_hole (studs X, studs Y, side thickness in studs)
 #
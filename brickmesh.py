@@ -0,0 +1,302 @@
+"""
+brickmesh.py -- Paul Cobbaut, 2026-10-17
+Writes Lego-compatible bricks and plates straight to .stl without FreeCAD or OCC booleans
+A brick is only boxes and tubes, so every triangle is computed from brick_dimensions.py:
+the walls, the ceiling, an optional hole in the centre, the studs and the underside tubes
+make one closed surface, the studs and tubes stand in round openings of the top and ceiling
+  python3 brickmesh.py 5 42 --directory "/home/paul/FreeCAD models/brick_python/"
+  python3 brickmesh.py 8 12 --hole 2
+  python3 brickmesh.py 12 16 --catalogue 1,2,3
+  python3 brickmesh.py 8 12 --hole 2 --verify
+"""
+
+import argparse
+import math
+import os
+
+import numpy as np
+import voxelmesh
+from brick_dimensions import *
+
+# straight sides per stud and per tube, more segments give rounder studs and bigger files
+# a multiple of 4, so every side of the cell around a stud or tube faces a point of its circle
+segments = 32
+
+
+# turns every triangle so its normal points along wanted, wanted is (3,) or (n, 3)
+def orient(triangles, wanted):
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    flip = (normals * wanted).sum(axis=1) < 0
+    triangles[flip] = triangles[flip][:, ::-1]
+    return triangles
+
+
+# a flat rectangle (x0, y0, x1, y1) at height z, with a rectangular hole when inner is given
+def rectangle(outer, z, up, inner=None):
+    x0, y0, x1, y1 = outer
+    corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    if inner is None:
+        quads = [corners]
+    else:
+        a0, b0, a1, b1 = inner
+        holes = [(a0, b0), (a1, b0), (a1, b1), (a0, b1)]
+        quads = [[corners[k], corners[(k + 1) % 4], holes[(k + 1) % 4], holes[k]] for k in range(4)]
+    triangles = []
+    for p, q, r, s in quads:
+        triangles += [(p, q, r), (p, r, s)]
+    triangles = np.array([[(x, y, z) for x, y in triangle] for triangle in triangles], dtype=np.float64)
+    return orient(triangles, np.array([0, 0, 1 if up else -1]))
+
+
+# the points of points (x, y) that lie on the segment from a to b, without a and b, ordered from a to b
+def on_side(points, a, b):
+    (ax, ay), (bx, by) = a, b
+    if ay == by:
+        found = [(x, y) for x, y in points if y == ay and min(ax, bx) < x < max(ax, bx)]
+        return sorted(found, key=lambda point: abs(point[0] - ax))
+    found = [(x, y) for x, y in points if x == ax and min(ay, by) < y < max(ay, by)]
+    return sorted(found, key=lambda point: abs(point[1] - ay))
+
+
+# the four vertical sides of a rectangle from z0 to z1, facing away from its centre or towards it
+# the top edge is split at every point of points (x, y) on it, so it meets a face cut in cells exactly
+def walls(rect, z0, z1, outwards, points=()):
+    x0, y0, x1, y1 = rect
+    corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    sides = [(0, -1, 0), (1, 0, 0), (0, 1, 0), (-1, 0, 0)]
+    triangles = []
+    wanted = []
+    for k in range(4):
+        a, b = corners[k], corners[(k + 1) % 4]
+        top = [a] + on_side(points, a, b) + [b]
+        side = np.array(sides[k]) * (1 if outwards else -1)
+        for p, q in zip(top, top[1:]):
+            triangles.append(((a[0], a[1], z0), (p[0], p[1], z1), (q[0], q[1], z1)))
+        triangles.append(((a[0], a[1], z0), (b[0], b[1], z0), (b[0], b[1], z1)))
+        wanted += [side] * len(top)
+    return orient(np.array(triangles, dtype=np.float64), np.array(wanted))
+
+
+# the rectangles (x0, y0, x1, y1) of the grid xbreaks by ybreaks, a rectangle that overlaps cut
+# is split along cut and the parts inside cut are left out, cut is (x0, y0, x1, y1) or None
+def cells(xbreaks, ybreaks, cut=None):
+    result = []
+    for x0, x1 in zip(xbreaks, xbreaks[1:]):
+        for y0, y1 in zip(ybreaks, ybreaks[1:]):
+            if cut is None or not (x0 < cut[2] and cut[0] < x1 and y0 < cut[3] and cut[1] < y1):
+                result.append((x0, y0, x1, y1))
+                continue
+            xs = [x0] + [x for x in (cut[0], cut[2]) if x0 < x < x1] + [x1]
+            ys = [y0] + [y for y in (cut[1], cut[3]) if y0 < y < y1] + [y1]
+            for a0, a1 in zip(xs, xs[1:]):
+                for b0, b1 in zip(ys, ys[1:]):
+                    if not (cut[0] <= a0 and a1 <= cut[2] and cut[1] <= b0 and b1 <= cut[3]):
+                        result.append((a0, b0, a1, b1))
+    return result
+
+
+# every corner (x, y) of rects
+def corner_points(rects):
+    return set((x, y) for x0, y0, x1, y1 in rects for x in (x0, x1) for y in (y0, y1))
+
+
+# a flat face at height z made of rects, circles (cx, cy, r) are cut out of the rectangle that holds their centre
+# a corner of one rectangle on the side of another one splits that side, so the face has no T-junctions
+# the edge of every circle uses the points of circle(), the same as the cylinder standing on it
+def face(rects, z, up, circles=()):
+    points = corner_points(rects)
+    quarter = segments // 4
+    triangles = []
+    for x0, y0, x1, y1 in rects:
+        corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+        sides = [[corners[k]] + on_side(points, corners[k], corners[(k + 1) % 4]) + [corners[(k + 1) % 4]] for k in range(4)]
+        inside = [(cx, cy, r) for cx, cy, r in circles if x0 < cx < x1 and y0 < cy < y1]
+        if inside != []:
+            cx, cy, r = inside[0]
+            rim = [tuple(point[:2]) for point in circle(cx, cy, r, z)]
+            # side k faces the rim point straight across, every corner sees the quarter of the rim between two sides
+            for k in range(4):
+                foot = (3 + k) % 4 * quarter
+                triangles += [(rim[foot], p, q) for p, q in zip(sides[k], sides[k][1:])]
+                triangles += [(sides[k][-1], rim[(foot + n) % segments], rim[(foot + n + 1) % segments]) for n in range(quarter)]
+        elif all(len(side) == 2 for side in sides):
+            triangles += [(corners[0], corners[1], corners[2]), (corners[0], corners[2], corners[3])]
+        else:
+            centre = ((x0 + x1) / 2, (y0 + y1) / 2)
+            boundary = [point for side in sides for point in side[:-1]]
+            triangles += [(centre, p, q) for p, q in zip(boundary, boundary[1:] + boundary[:1])]
+    triangles = np.array([[(x, y, z) for x, y in triangle] for triangle in triangles], dtype=np.float64)
+    return orient(triangles, np.array([0, 0, 1 if up else -1]))
+
+
+# points around a circle, one per segment
+def circle(cx, cy, r, z):
+    angles = np.arange(segments) * 2 * math.pi / segments
+    return np.stack((cx + r * np.cos(angles), cy + r * np.sin(angles), np.full(segments, z)), axis=1)
+
+
+# the side of a cylinder from z0 to z1, facing away from its axis or towards it
+def cylinder_side(cx, cy, r, z0, z1, outwards):
+    bottom, top = circle(cx, cy, r, z0), circle(cx, cy, r, z1)
+    turn = np.roll(np.arange(segments), -1)
+    triangles = np.concatenate((
+        np.stack((bottom, bottom[turn], top[turn]), axis=1),
+        np.stack((bottom, top[turn], top), axis=1),
+    ))
+    wanted = triangles.mean(axis=1) - (cx, cy, 0)
+    wanted[:, 2] = 0
+    return orient(triangles, wanted if outwards else -wanted)
+
+
+# a flat ring between two circles at height z, or a full disc when inner is 0
+def disc(cx, cy, inner, outer, z, up):
+    turn = np.roll(np.arange(segments), -1)
+    rim = circle(cx, cy, outer, z)
+    if inner == 0:
+        centre = np.tile((cx, cy, z), (segments, 1))
+        triangles = np.stack((centre, rim, rim[turn]), axis=1)
+    else:
+        hole = circle(cx, cy, inner, z)
+        triangles = np.concatenate((
+            np.stack((hole, rim, rim[turn]), axis=1),
+            np.stack((hole, rim[turn], hole[turn]), axis=1),
+        ))
+    return orient(triangles, np.array([0, 0, 1 if up else -1]))
+
+
+# a stud standing on z, open at the bottom where it joins the top of the brick
+def stud(cx, cy, z):
+    return np.concatenate((
+        cylinder_side(cx, cy, stud_radius_mm, z, z + stud_height_mm, True),
+        disc(cx, cy, 0, stud_radius_mm, z + stud_height_mm, True),
+    ))
+
+
+# an underside tube from the floor up to the ceiling at height, its outside joins the ceiling
+# and its bore is closed by the ceiling inside it
+def tube(cx, cy, height):
+    return np.concatenate((
+        cylinder_side(cx, cy, cylinder_radius_outer_mm, 0, height, True),
+        cylinder_side(cx, cy, cylinder_radius_inner_mm, 0, height, False),
+        disc(cx, cy, 0, cylinder_radius_inner_mm, height, False),
+        disc(cx, cy, cylinder_radius_inner_mm, cylinder_radius_outer_mm, 0, False),
+    ))
+
+
+# all triangles of a brick (height brick_height_mm) or a plate (height plate_height_mm), one closed surface
+# hollow=False gives a flat bottom, studs_side > 0 cuts a hole in the centre with a wall around it
+# underside tubes that would reach into the hole are left out, see brick_dimensions.tube_positions
+# the top is cut in one cell per stud and the ceiling in one cell per tube, every stud and tube
+# stands in the round opening of its cell
+def brick_triangles(xstuds, ystuds, height=brick_height_mm, hollow=True, studs_side=0):
+    width = calculate_width(xstuds)
+    length = calculate_width(ystuds)
+    wall = brick_wall_thickness_mm
+    ceiling = height - wall
+    outer = (0, 0, width, length)
+    hole = centre_hole(xstuds, ystuds, studs_side) if studs_side > 0 else None
+    studs = stud_positions(xstuds, ystuds, studs_side)
+    xbreaks = [0] + [i * stud_center_spacing_mm for i in range(1, int(xstuds))] + [width]
+    ybreaks = [0] + [j * stud_center_spacing_mm for j in range(1, int(ystuds))] + [length]
+    top = cells(xbreaks, ybreaks, hole)
+    points = corner_points(top)
+    parts = [walls(outer, 0, height, True, points), face(top, height, True, [(cx, cy, stud_radius_mm) for cx, cy in studs])]
+    parts += [stud(cx, cy, height) for cx, cy in studs]
+    if hole is not None:
+        parts.append(walls(hole, 0, height, False, points))
+    if hollow:
+        inner = (wall, wall, width - wall, length - wall)
+        tubes = tube_positions(xstuds, ystuds, studs_side)
+        half = stud_center_spacing_mm / 2
+        xbreaks = sorted(set([inner[0], inner[2]] + [cx + side * half for cx, cy in tubes for side in (-1, 1)]))
+        ybreaks = sorted(set([inner[1], inner[3]] + [cy + side * half for cx, cy in tubes for side in (-1, 1)]))
+        around = None
+        if hole is not None:
+            around = (hole[0] - wall, hole[1] - wall, hole[2] + wall, hole[3] + wall)
+        under = cells(xbreaks, ybreaks, around)
+        points = corner_points(under)
+        parts += [rectangle(outer, 0, False, inner), walls(inner, 0, ceiling, False, points)]
+        parts.append(face(under, ceiling, False, [(cx, cy, cylinder_radius_outer_mm) for cx, cy in tubes]))
+        parts += [tube(cx, cy, ceiling) for cx, cy in tubes]
+        if hole is not None:
+            parts += [walls(around, 0, ceiling, True, points), rectangle(around, 0, False, hole)]
+    else:
+        parts.append(rectangle(outer, 0, False, hole))
+    return np.concatenate(parts)
+
+
+# True when every edge of triangles is shared by exactly two triangles that run along it in opposite
+# directions: one closed surface without gaps, T-junctions or faces inside the solid
+def watertight(triangles):
+    points, index = np.unique(triangles.reshape(-1, 3), axis=0, return_inverse=True)
+    index = index.reshape(-1, 3)
+    edges = np.concatenate((index[:, [0, 1]], index[:, [1, 2]], index[:, [2, 0]]))
+    directed, counts = np.unique(edges, axis=0, return_counts=True)
+    if np.any(counts != 1):
+        return False
+    return np.array_equal(directed, np.unique(edges[:, ::-1], axis=0))
+
+
+# writes one brick to a binary .stl, returns the number of triangles
+# verify=True checks that the brick is one closed surface first, it takes longer than the export
+def export_brick_stl(filename, xstuds, ystuds, height=brick_height_mm, hollow=True, studs_side=0, verify=False):
+    triangles = brick_triangles(xstuds, ystuds, height, hollow, studs_side)
+    if verify and not watertight(triangles):
+        raise ValueError("Error PC: brick " + str(xstuds) + "x" + str(ystuds) + " is not one closed surface")
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    name = os.path.splitext(os.path.basename(filename))[0]
+    voxelmesh.write_stl(filename, normals, triangles, name)
+    return len(triangles)
+
+
+# the same series and file names as create_brick_series and create_brick_series_with_hole of brick_freecad.py
+def export_brick_series(studs_x, studs_y_max, directory, height=brick_height_mm, hollow=True, studs_side=0, verify=False):
+    names = []
+    for i in range(int(studs_x), int(studs_y_max) + 1):
+        if studs_side > 0:
+            brick_name = "brick_with_hole_" + str(studs_x) + 'x' + str(i) + '_border_' + str(studs_side)
+        else:
+            brick_name = ("brick_" if height == brick_height_mm else "plate_") + str(studs_x) + 'x' + str(i)
+        export_brick_stl(os.path.join(directory, brick_name + ".stl"), studs_x, i, height, hollow, studs_side, verify)
+        names.append(brick_name)
+    return names
+
+
+# every brick with a hole of brick_dimensions.hole_catalogue, cheapest first
+def export_hole_catalogue(x_max, y_max, sides, directory, verify=False):
+    names = []
+    for studs_x, studs_y, studs_side in hole_catalogue(x_max, y_max, sides):
+        brick_name = "brick_with_hole_" + str(studs_x) + 'x' + str(studs_y) + '_border_' + str(studs_side)
+        export_brick_stl(os.path.join(directory, brick_name + ".stl"), studs_x, studs_y, studs_side=studs_side, verify=verify)
+        names.append(brick_name)
+    return names
+
+
+def main():
+    global segments
+    parser = argparse.ArgumentParser(description="write a series of Lego-compatible bricks as .stl, without FreeCAD")
+    parser.add_argument("studs_x", type=int)
+    parser.add_argument("studs_y_max", type=int)
+    parser.add_argument("--directory", default=".")
+    parser.add_argument("--plate", action="store_true", help="plate_height_mm instead of brick_height_mm")
+    parser.add_argument("--flat", action="store_true", help="a flat bottom without tubes")
+    parser.add_argument("--hole", type=int, default=0, metavar="STUDS_SIDE", help="a hole in the centre with this many studs around it")
+    parser.add_argument("--segments", type=int, default=segments, help="a multiple of 4")
+    parser.add_argument("--catalogue", metavar="SIDES", help="every brick with a hole up to studs_x by studs_y_max, for these comma separated borders")
+    parser.add_argument("--verify", action="store_true", help="check that every brick is one closed surface before it is written")
+    args = parser.parse_args()
+    if args.segments < 8 or args.segments % 4 != 0:
+        parser.error("--segments must be a multiple of 4, at least 8")
+    segments = args.segments
+    height = plate_height_mm if args.plate else brick_height_mm
+    if args.catalogue:
+        sides = [int(side) for side in args.catalogue.split(",")]
+        names = export_hole_catalogue(args.studs_x, args.studs_y_max, sides, args.directory, args.verify)
+    else:
+        names = export_brick_series(args.studs_x, args.studs_y_max, args.directory, height, not args.flat, args.hole, args.verify)
+    print("Written:", len(names), "bricks to", args.directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+disassembly.py -- Paul Cobbaut, 2026-10-17
+Checks if the pieces of a voxel puzzle (a label cube from voxelgrid.py) can be slid apart
+Every piece is a bitset (a python int) in a frame that is margin units bigger than the cube
+A move slides one piece one unit along +x, -x, +y, -y, +z or -z without hitting another piece,
+a piece is removed when it can slide out of the frame without hitting anything
+"""
+
+import numpy as np
+import voxelgrid
+
+direction_names = ("-x", "+x", "-y", "+y", "-z", "+z")
+
+
+# the cube with a margin of free units around it, stored as bits
+class Frame:
+    def __init__(self, size, margin):
+        self.size = size
+        self.margin = margin
+        self.side = size + 2 * margin
+        side = self.side
+        self.strides = (side * side, side, 1)
+        # the outermost layer of the frame on every side, a piece touching it cannot move further
+        self.edges = []
+        for axis, sign in ((0, -1), (0, 1), (1, -1), (1, 1), (2, -1), (2, 1)):
+            layer = np.zeros((side, side, side), dtype=bool)
+            index = [slice(None)] * 3
+            index[axis] = 0 if sign < 0 else side - 1
+            layer[tuple(index)] = True
+            self.edges.append(self.bits(layer))
+        self.sweeps = {}
+
+    # a boolean frame sized cube to a bitset, bit (x * side + y) * side + z
+    def bits(self, cube):
+        packed = np.packbits(cube.ravel(), bitorder="little")
+        return int.from_bytes(packed.tobytes(), "little")
+
+    # a boolean cube-sized piece to a bitset inside the frame
+    def mask(self, cube):
+        m = self.margin
+        framed = np.zeros((self.side, self.side, self.side), dtype=bool)
+        framed[m:m + self.size, m:m + self.size, m:m + self.size] = cube
+        return self.bits(framed)
+
+    # the piece moved one unit in direction (an index in direction_names), or None when it leaves the frame
+    def shift(self, mask, direction):
+        if mask & self.edges[direction]:
+            return None
+        stride = self.strides[direction // 2]
+        if direction % 2 == 0:
+            return mask >> stride
+        return mask << stride
+
+    # every unit the piece passes through while sliding out of the frame in direction
+    # remembered per piece and direction, the same positions come back in every search
+    def sweep(self, mask, direction):
+        key = (mask, direction)
+        if key not in self.sweeps:
+            stride = self.strides[direction // 2]
+            edge = self.edges[direction]
+            swept = 0
+            while mask:
+                mask &= ~edge
+                mask = mask >> stride if direction % 2 == 0 else mask << stride
+                swept |= mask
+            self.sweeps[key] = swept
+        return self.sweeps[key]
+
+
+# breadth first search over single piece moves until one piece can be removed
+# pieces is a dict pieceid: bitset, returns (path of moves, removed pieceid, direction, new pieces)
+# False when no position that can be reached lets a piece out, None when max_states positions were not enough
+def search_removal(frame, pieces, max_states):
+    ids = sorted(pieces)
+    start = tuple(pieces[pieceid] for pieceid in ids)
+    seen = {start: None}
+    wave = [start]
+    while wave != []:
+        nextwave = []
+        for state in wave:
+            occupied = 0
+            for mask in state:
+                occupied |= mask
+            for i, mask in enumerate(state):
+                others = occupied ^ mask
+                for direction in range(6):
+                    if frame.sweep(mask, direction) & others == 0:
+                        path = []
+                        previous = state
+                        while seen[previous] is not None:
+                            previous, move = seen[previous]
+                            path.append(move)
+                        path.reverse()
+                        remaining = {pieceid: state[j] for j, pieceid in enumerate(ids) if j != i}
+                        return path, ids[i], direction, remaining
+                    moved = frame.shift(mask, direction)
+                    if moved is None or moved & others:
+                        continue
+                    newstate = state[:i] + (moved,) + state[i + 1:]
+                    if newstate not in seen:
+                        seen[newstate] = (state, (ids[i], direction_names[direction]))
+                        nextwave.append(newstate)
+        if len(seen) > max_states:
+            return None
+        wave = nextwave
+    return False
+
+
+# tries to take the puzzle apart piece by piece
+# returns a dict with possible (True or False, None when max_states was not enough), moves (the number
+# of single unit slides and removals), sequence (a list of (pieceid, move) where move is like "+x" or "remove -z"),
+# locked (the pieces that stay stuck, empty when possible is None) and left (the pieces that were not taken out)
+def disassemble(labels, margin=1, max_states=20000):
+    frame = Frame(labels.shape[0], margin)
+    pieces = {pieceid: frame.mask(labels == pieceid) for pieceid in voxelgrid.piece_ids(labels)}
+    sequence = []
+    exhausted = False
+    while len(pieces) > 1:
+        found = search_removal(frame, pieces, max_states)
+        if found is None:
+            exhausted = True
+        if not found:
+            break
+        path, pieceid, direction, pieces = found
+        sequence.extend(path)
+        sequence.append((pieceid, "remove " + direction_names[direction]))
+    # the last piece is free as soon as all others are gone
+    if len(pieces) == 1:
+        pieces = {}
+    return {
+        "possible": None if exhausted else len(pieces) == 0,
+        "moves": len(sequence),
+        "sequence": sequence,
+        "locked": [] if exhausted else sorted(pieces),
+        "left": sorted(pieces),
+    }
@@ -0,0 +1,343 @@
+"""
+exactcover.py -- Paul Cobbaut, 2026-10-17
+Counts the solutions of a voxel puzzle: in how many ways the pieces of a label cube
+fill the same units again, every piece used once, in any of its 24 rotations
+This is an exact cover problem solved with Knuth's Algorithm X: instead of the linked lists
+of dancing links every column keeps its rows as one bitset, covering a column is a single
+and-not on the rows that still fit, and nothing has to be uncovered when backtracking,
+an empty region that no sum of the pieces left can fill stops a search step early
+"""
+
+import time
+import numpy as np
+import voxelgrid
+import voxelshapes
+
+
+# the different rotations of one piece, as sorted unit coordinates
+def orientations(cube):
+    result = {}
+    for orientation in voxelshapes.rotated_units(cube):
+        result.setdefault(orientation.tobytes(), orientation)
+    return list(result.values())
+
+
+# all positions of one piece in all its rotations where every unit falls inside target
+# returns a list of tuples of flat unit indices
+def placements(cube, target):
+    sx, sy, sz = target.shape
+    result = []
+    for orientation in orientations(cube):
+        extent = orientation.max(axis=0)
+        if np.any(extent >= target.shape):
+            continue
+        ranges = [np.arange(side - e) for side, e in zip(target.shape, extent)]
+        offsets = np.stack(np.meshgrid(*ranges, indexing="ij"), axis=-1).reshape(-1, 3)
+        cells = orientation[None, :, :] + offsets[:, None, :]
+        inside = target[cells[:, :, 0], cells[:, :, 1], cells[:, :, 2]].all(axis=1)
+        flat = (cells[inside, :, 0] * sy + cells[inside, :, 1]) * sz + cells[inside, :, 2]
+        result.extend(tuple(sorted(row)) for row in flat.tolist())
+    return result
+
+
+# the 24 rotations of the whole cube as permutations of the flat unit indices
+# or None when target does not stay the same under every rotation
+def cube_symmetries(target):
+    size = target.shape[0]
+    if target.shape != (size, size, size):
+        return None
+    coordinates = np.argwhere(np.ones(target.shape, dtype=bool))
+    centered = 2 * coordinates - (size - 1)
+    permutations = []
+    for rotation in voxelshapes.rotations:
+        turned = (centered @ rotation.T + (size - 1)) // 2
+        flat = (turned[:, 0] * size + turned[:, 1]) * size + turned[:, 2]
+        if not np.array_equal(target.ravel()[flat], target.ravel()):
+            return None
+        permutations.append(flat)
+    return permutations
+
+
+# keeps one placement of every group of placements that are rotations of each other
+def unique_under(rows, permutations):
+    result = []
+    for row in rows:
+        cells = np.array(row)
+        if all(tuple(sorted(p[cells].tolist())) >= row for p in permutations):
+            result.append(row)
+    return result
+
+
+# the empty units of a cube as one python int (bit n is flat unit n) and its 6-connected regions
+# a region can only be filled when its size is a sum of the sizes of the pieces that are left
+class Regions:
+    def __init__(self, shape, shapecolumns, widths):
+        self.shapecolumns = shapecolumns
+        self.widths = widths
+        # a region of more than twice the biggest piece can almost always be filled
+        self.most = 2 * max(widths)
+        coordinates = np.indices(shape).reshape(3, -1)
+        strides = (shape[1] * shape[2], shape[2], 1)
+        # one step along every axis: the units that may move up and the units that may move down
+        self.steps = []
+        for axis in range(3):
+            self.steps.append((strides[axis], units_to_bits(np.flatnonzero(coordinates[axis] < shape[axis] - 1)), units_to_bits(np.flatnonzero(coordinates[axis] > 0))))
+
+    # the units next to the units of bits
+    def around(self, bits):
+        result = 0
+        for stride, up, down in self.steps:
+            result |= ((bits & up) << stride) | ((bits & down) >> stride)
+        return result & ~bits
+
+    # the region of free that holds the units of seed, grown one layer of units at a time
+    # stops with None as soon as it has more than most units
+    def grow(self, seed, free, most):
+        (sx, ux, dx), (sy, uy, dy), (sz, uz, dz) = self.steps
+        region = front = seed
+        while front:
+            front = (((front & ux) << sx) | ((front & dx) >> sx) | ((front & uy) << sy) | ((front & dy) >> sy)
+                     | ((front & uz) << sz) | ((front & dz) >> sz)) & free & ~region
+            region |= front
+            if region.bit_count() > most:
+                return None
+        return region
+
+    # False when a region of free next to the units of placed cannot be filled by the pieces that are left,
+    # need[j] of every shape column
+    # a region of more than most units is not grown any further and ends the check,
+    # growing it costs more than the search steps it saves
+    def fit(self, free, need, placed):
+        seeds = self.around(placed) & free
+        sums = None
+        while seeds:
+            region = self.grow(seeds & -seeds, free, self.most)
+            if region is None:
+                return True
+            if sums is None:
+                sums = 1
+                for j, width in zip(self.shapecolumns, self.widths):
+                    for piece in range(need[j]):
+                        sums |= sums << width
+            if not (sums >> region.bit_count()) & 1:
+                return False
+            seeds &= ~region
+        return True
+
+
+# flat unit indices as one python int
+def units_to_bits(units):
+    bits = 0
+    for unit in units:
+        bits |= 1 << int(unit)
+    return bits
+
+
+# the exact cover matrix with the rows of every column as a bitset (a python int, bit n is row n)
+# a search state is the bitset of rows that still fit plus the list of columns that are still open
+# need says how many rows a column takes: 1 for a unit, the number of congruent pieces for a shape
+# regions (with rowbits, the units of every row as a python int) drops a search step as soon as
+# an empty region can no longer be filled
+# the search gives up after max_nodes steps or, with max_seconds, after that many seconds
+class Cover:
+    def __init__(self, rows, numcolumns, need, max_nodes, regions=None, rowbits=None, max_seconds=None):
+        self.rows = rows
+        self.columns = [0] * numcolumns
+        for n, row in enumerate(rows):
+            for j in row:
+                self.columns[j] |= 1 << n
+        self.need = list(need)
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.deadline = None if max_seconds is None else time.time() + max_seconds
+        self.regions = regions
+        self.rowbits = rowbits
+        self.chosen = []
+        self.solutions = None
+
+    # Algorithm X, always branches on the column with the fewest rows, stops at cap solutions
+    # a shape column that still needs more than one piece is never branched on,
+    # so a solution is found once and not once for every order of its congruent pieces
+    # free is the python int of the empty units when there are regions
+    # returns None when the search needs more than max_nodes steps or runs past the deadline
+    def count(self, alive, open_columns, cap, free=None):
+        if open_columns == []:
+            if self.solutions is not None:
+                self.solutions.append(list(self.chosen))
+            return 1
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            return None
+        if self.deadline is not None and time.time() > self.deadline:
+            return None
+        best = None
+        bestcount = len(self.rows) + 1
+        for j in open_columns:
+            live = self.columns[j] & alive
+            n = live.bit_count()
+            if n < self.need[j]:
+                return 0
+            if self.need[j] == 1 and n < bestcount:
+                best, bestcount = live, n
+        if best is None:
+            return 0
+        total = 0
+        while best:
+            bit = best & -best
+            best ^= bit
+            n = bit.bit_length() - 1
+            row = self.rows[n]
+            # covering a column drops every row that shares it, a shape column only loses one piece
+            remaining = alive
+            closed = []
+            for j in row:
+                self.need[j] -= 1
+                if self.need[j] == 0:
+                    remaining &= ~self.columns[j]
+                    closed.append(j)
+            self.chosen.append(n)
+            if self.regions is None:
+                found = self.count(remaining, [j for j in open_columns if j not in closed], cap - total)
+            elif self.regions.fit(free & ~self.rowbits[n], self.need, self.rowbits[n]):
+                found = self.count(remaining, [j for j in open_columns if j not in closed], cap - total, free & ~self.rowbits[n])
+            else:
+                found = 0
+            self.chosen.pop()
+            for j in row:
+                self.need[j] += 1
+            if found is None:
+                return None
+            total += found
+            if total >= cap:
+                break
+        return total
+
+
+# the rows of an exact cover for the pieces of labels that fill target: one column per unit of target
+# followed by one column per shape of groups, fixed is a piece that only takes the placements of unique_under
+# returns the rows, the need of every column and the units of every row as a python int
+def cover_rows(labels, target, groups, fixed=None, permutations=None):
+    unitcolumn = np.full(target.size, -1, dtype=np.int64)
+    unitcolumn[target.ravel()] = np.arange(np.count_nonzero(target))
+    numunits = np.count_nonzero(target)
+    rows = []
+    rowbits = []
+    need = [1] * numunits
+    for shape, group in enumerate(groups):
+        need.append(len(group))
+        cells = placements(labels == group[0], target)
+        if group[0] == fixed:
+            cells = unique_under(cells, permutations)
+        for row in cells:
+            rows.append(unitcolumn[list(row)].tolist() + [numunits + shape])
+            rowbits.append(units_to_bits(row))
+    return rows, need, rowbits
+
+
+# every piece of labels as (shape, sorted flat units), a solution is the set of them
+def layout(labels, groups):
+    result = set()
+    for shape, group in enumerate(groups):
+        for pieceid in group:
+            result.add((shape, tuple(np.flatnonzero(labels.ravel() == pieceid).tolist())))
+    return result
+
+
+# True when the solutions first and second are the same, or when permutations (the rotations of the cube
+# from cube_symmetries, or None) turn one into the other
+def same_solution(first, second, permutations):
+    if first == second:
+        return True
+    for permutation in permutations or []:
+        if set((shape, tuple(sorted(permutation[list(units)].tolist()))) for shape, units in first) == second:
+            return True
+    return False
+
+
+# the pairs of pieces of labels that touch each other, as a dict piece : set of pieces
+def touching(labels):
+    result = {pieceid: set() for pieceid in voxelgrid.piece_ids(labels)}
+    for direction in voxelgrid.directions:
+        other = voxelgrid.shifted(labels, direction, voxelgrid.OUTSIDE)
+        both = (labels > 0) & (other > 0) & (other != labels)
+        for a, b in zip(labels[both].tolist(), other[both].tolist()):
+            result[a].add(b)
+    return result
+
+
+# a second solution close to the layout of labels itself: a few touching pieces (up to most of them)
+# that fill their own units in another way
+# permutations are the rotations that do not make another solution, or None
+# returns True when there is such a solution
+def local_solution(labels, groups, permutations, most=2):
+    shapeof = {pieceid: shape for shape, group in enumerate(groups) for pieceid in group}
+    original = layout(labels, groups)
+    neighbours = touching(labels)
+    sets = [frozenset([pieceid]) for pieceid in neighbours]
+    for size in range(2, most + 1):
+        sets = set(piece | {other} for piece in sets for pieceid in piece for other in neighbours[pieceid] if other not in piece)
+        for pieces in sorted(sets, key=sorted):
+            region = np.isin(labels, list(pieces))
+            subgroups = {}
+            for pieceid in sorted(pieces):
+                subgroups.setdefault(shapeof[pieceid], []).append(pieceid)
+            subgroups = list(subgroups.values())
+            rows, need, rowbits = cover_rows(labels, region, subgroups)
+            cover = Cover(rows, len(need), need, 100000)
+            cover.solutions = []
+            cover.count((1 << len(rows)) - 1, list(range(len(need))), 3)
+            units = np.flatnonzero(region.ravel())
+            rest = set(piece for piece in original if not region.ravel()[piece[1][0]])
+            for solution in cover.solutions:
+                new = set(rest)
+                for row in solution:
+                    columns = rows[row]
+                    new.add((shapeof[subgroups[columns[-1] - len(units)][0]], tuple(units[columns[:-1]].tolist())))
+                if not same_solution(original, new, permutations):
+                    return True
+    return False
+
+
+# counts the different solutions of the puzzle in labels, up to cap
+# swapping congruent pieces does not count as a different solution, and neither does turning
+# the whole cube when the cube has at least one piece that is not congruent to another
+# the layout of labels is the first solution, a few touching pieces that fill their units in another way
+# give a second one without a search, otherwise Algorithm X searches every placement of every piece
+# rigid puzzles with one solution can need far more steps than any budget to prove it,
+# so the search also stops after max_seconds (None searches up to max_nodes only)
+# returns a dict with solutions (None when max_nodes or max_seconds was not enough), capped (True when the search
+# stopped at cap), at_least (the number of different solutions found, also when solutions is None),
+# nodes (search steps) and placements (rows in the cover)
+def count_solutions(labels, cap=2, max_nodes=200000, max_seconds=10):
+    start = time.time()
+    target = (labels != voxelgrid.FULL) & (labels != voxelgrid.OUTSIDE)
+    groups = voxelshapes.congruent_groups(labels)
+    # one piece that is not congruent to another may only take one of its rotated positions,
+    # the piece with the most different rotations leaves the fewest turned solutions behind
+    permutations = cube_symmetries(target)
+    fixed = None
+    if permutations is not None:
+        singles = [group[0] for group in groups if len(group) == 1]
+        if singles != []:
+            fixed = max(singles, key=lambda pieceid: len(orientations(labels == pieceid)))
+    turned = permutations if fixed is not None else None
+    rows, need, rowbits = cover_rows(labels, target, groups, fixed, permutations)
+    at_least = 1
+    if cap > 1 and local_solution(labels, groups, turned):
+        at_least = 2
+    if at_least >= cap:
+        return {"solutions": cap, "capped": True, "at_least": cap, "nodes": 0, "placements": len(rows)}
+    numunits = np.count_nonzero(target)
+    widths = [int(np.count_nonzero(labels == group[0])) for group in groups]
+    regions = Regions(target.shape, list(range(numunits, len(need))), widths)
+    seconds = None if max_seconds is None else max(0, max_seconds - (time.time() - start))
+    cover = Cover(rows, len(need), need, max_nodes, regions, rowbits, seconds)
+    free = units_to_bits(np.flatnonzero(target.ravel()))
+    found = cover.count((1 << len(rows)) - 1, list(range(len(need))), cap, free)
+    return {
+        "solutions": None if found is None else min(found, cap),
+        "capped": found is not None and found >= cap,
+        "at_least": at_least if found is None else min(found, cap),
+        "nodes": cover.nodes,
+        "placements": len(rows),
+    }
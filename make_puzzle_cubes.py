@@ -6,12 +6,18 @@ from FreeCAD import Base, Vector
 import Part
 import Mesh
 import random
+import puzzlefile
+import puzzlegen
+import voxelgrid
+import voxelize
+import voxelmesh
 
 size   = 12                                                                         # cube size
-full   = [[[1 for k in range(size)] for j in range(size)] for i in range(size)]    # full cube
-empty  = [[[0 for k in range(size)] for j in range(size)] for i in range(size)]    # empty cube
-pieces = {}                                                                        # dict for all pieces
+seed   = None  # None = a random seed, the same seed always gives the same puzzle
 unitmm = 10  # size of a 1x1x1 3D printed cube
+orient = True  # export every piece turned to the orientation that needs the least support
+target_stl = None  # None = a full cube, or a closed .stl that gives the puzzle its shape, size then follows from unitmm
+export_directory = "/home/paul/FreeCAD_generated/"
 
 # FreeCAD document
 doc = FreeCAD.newDocument("Puzzel")
@@ -28,34 +34,22 @@ def print_cube(cubename, cube):
         print(']')
     print("Cube end: " + cubename)
 
-def print_all_pieces():
-    for piecename, piece in pieces.items():
-        print_cube(piecename, piece)
-
-def move(fromcube, tocube, x, y, z):
-    if fromcube[x][y][z] == 1 and tocube[x][y][z] == 0:
-        fromcube[x][y][z] = 0
-        tocube[x][y][z] = 1
-    else:
-        print("Error PC: problem in move")
-        quit()
-
-def move_row(fromcube, pieceindex, x, y):
-    for z in range(size):
-        move(fromcube, pieces["blk{0}".format(pieceindex)], x, y, z)
+def piece_name(pieceid):
+    return "blk{0}".format(pieceid)
 
-def move_unit(fromcube, pieceindex, x, y, z):
-        move(fromcube, pieces["blk{0}".format(pieceindex)], x, y, z)
+def print_all_pieces():
+    for pieceid in voxelgrid.piece_ids(labels):
+        print_cube(piece_name(pieceid), voxelgrid.piece_cube(labels, pieceid))
 
-def makeunitcube(x, y, z):
+# one box of lx by ly by lz units, make_3mf recomputes once for the whole piece
+def makecuboid(x, y, z, lx, ly, lz):
     obj        = doc.addObject("Part::Box","Box")
     obj.Label  = "Box"
-    obj.Length = unitmm
-    obj.Width  = unitmm
-    obj.Height = unitmm
+    obj.Length = unitmm*lx
+    obj.Width  = unitmm*ly
+    obj.Height = unitmm*lz
     position = FreeCAD.Vector(unitmm*x, unitmm*y, unitmm*z)
     obj.Placement = FreeCAD.Placement(position, FreeCAD.Rotation(Vector(0,0,1),0))
-    doc.recompute()
     return obj
 
 def make_3mf(name, compound):
@@ -64,77 +58,57 @@ def make_3mf(name, compound):
     doc.recompute()
     export_list = []
     export_list.append(cobj)
-    Mesh.export(export_list, u"/home/paul/FreeCAD_generated/" + name + ".stl")
+    Mesh.export(export_list, export_directory + name + ".stl")
 
-def pieces_to_3mf(pieces):
-    for piecename, piece in pieces.items():
+def pieces_to_3mf(labels):
+    for pieceid in voxelgrid.piece_ids(labels):
         compound_piece = []
-        for x, X in enumerate(piece):
-            for y, Y in enumerate(X):
-                for z, Z in enumerate(Y):
-                    if Z == 1:
-                        piecepart = makeunitcube(x,y,z)
-                        compound_piece.append(piecepart)
-        make_3mf(piecename, compound_piece)
-
-def unit_still_in_full(x, y, z):
-    if full[x][y][z] == 1:
-        return True
-    return False
-
-def move_unit_to_adjacent(x, y, z):
-    # find current adjacent pieces
-    adj = []
-    for piecename, piece in pieces.items():
-        if x >= 1:
-            tx = x - 1
-        else:
-            tx = x
-        if piece[tx][y][z] == 1:
-            adj.append(piecename)
-        if x == size - 1:
-            tx = x
-        else:
-            tx = x + 1
-        if piece[tx][y][z] == 1:
-            adj.append(piecename)
-        if y >= 1:
-            ty = y - 1
-        else:
-            ty = y
-        if piece[x][ty][z] == 1:
-            adj.append(piecename)
-        if y == size - 1:
-            ty = y
-        else:
-            ty = y + 1
-        if piece[x][ty][z] == 1:
-            adj.append(piecename)
-    print('adjacent are ' + str(adj))
-    # choose one of the adjacent pieces and attach to it
-    move_unit(full, random.choice(adj)[3:], x, y, z)
-    return
-
-# creates straight pieces but skips one every time
-skip = True
-i = 0
-for x in range(size):
-    for y in range(size):
-        pieces["blk{0}".format(i)] = [[[0 for k in range(size)] for j in range(size)] for i in range(size)]
-        if skip:
-            move_row(full, i, x, y)
-            skip = False
-        else:
-            skip = True
-        i += 1
-
-# second round
-for x in range(size):
-    for y in range(size):
-        for z in range(size):
-            if unit_still_in_full(x,y,z):
-                move_unit_to_adjacent(x,y,z)
+        for x, y, z, lx, ly, lz in voxelgrid.cuboids(voxelgrid.piece_cube(labels, pieceid)):
+            piecepart = makecuboid(x, y, z, lx, ly, lz)
+            compound_piece.append(piecepart)
+        make_3mf(piece_name(pieceid), compound_piece)
+
+# writes every different shape straight to a binary .stl, without FreeCAD objects
+# congruent pieces share one .stl, print_list.txt says how many of each to print
+def pieces_to_stl(labels):
+    printlist = voxelmesh.export_pieces_stl(labels, export_directory, unitmm, piece_name, orient=orient)
+    print("Exported:", len(printlist), "different shapes for", sum(count for name, count, pieceids in printlist), "pieces")
+
+# to try many seeds and keep the best puzzles, run outside FreeCAD:
+#   python3 puzzlegen.py puzzle --size 12 --seeds 0:1000 --best 10
+if seed is None:
+    seed = random.randrange(2**32)
+print("Seed:", seed)
+
+# the units of the target shape, every other unit of the cube stays outside the puzzle
+mask = None
+if target_stl is not None:
+    mask = voxelize.voxelize_stl(target_stl, unitmm)
+    size = mask.shape[0]
+    print("Target:", target_stl, "size:", size, "units:", int(mask.sum()))
+
+# straight pieces but skips one every time,
+# second round, grow the pieces until no unit can be attached anymore
+labels, stats = puzzlegen.puzzle_cube(size, seed, mask)
+numpieces = int(labels.max())
+print("Growth:", stats["waves"], "waves,", stats["visits"], "visits,", stats["attached"], "attached")
+print("Leftover:", stats["leftover"])
+print("Rebalance:", stats["merged"], "merged,", stats["new"], "new,", stats["split"], "split,", stats["oversized"], "oversized")
+
+# save the puzzle, python3 puzzlefile.py exports it again without generating
+puzzlefile.save(export_directory + "puzzle_" + str(seed) + ".npz", labels, seed, {"kind": "puzzle", "size": size, "minsize": 3, "unitmm": unitmm, "target": target_stl, "orient": orient})
+
+# check that every piece is one solid of the right size
+for pieceid, problem in voxelgrid.check_pieces(labels, numpieces, 3):
+    if pieceid is None:
+        print("Problem:", problem)
+    else:
+        print("Problem:", piece_name(pieceid), problem)
+
+total, parts = puzzlegen.score(labels, numpieces, 3)
+print("Score:", round(total, 2), parts)
 
 #print_all_pieces()
-pieces_to_3mf(pieces)
+pieces_to_stl(labels)
+#pieces_to_3mf(labels)  # FreeCAD boxes, when a B-rep model is needed
 
@@ -8,14 +8,23 @@ from FreeCAD import Base, Vector
 import Part
 import Mesh
 import random
+import disassembly
+import puzzlefile
+import puzzlegen
+import voxelgrid
+import voxelize
+import voxelmesh
 
 size      = 6                                                                         # cube size
 numpieces = (size * 3) + 4
 maxsize   = 10 # max amount of units in one piece
-full      = [[[1 for k in range(size)] for j in range(size)] for i in range(size)]    # full cube
-empty     = [[[0 for k in range(size)] for j in range(size)] for i in range(size)]    # empty cube
-pieces    = {}                                                                        # dict for all pieces
+minsize   = 3  # min amount of units in one piece
+seed      = None # None = a random seed, the same seed always gives the same puzzle
 unitmm    = 10  # size of a 1x1x1 3D printed cube
+clearance = 0.2 # mm taken off every outside face of a piece, room to assemble the printed pieces
+orient    = True # export every piece turned to the orientation that needs the least support
+target_stl = None  # None = a full cube, or a closed .stl that gives the puzzle its shape, size then follows from unitmm
+export_directory = "/home/paul/FreeCAD_generated/"
 
 # FreeCAD document
 doc = FreeCAD.newDocument("Puzzel")
@@ -32,87 +41,24 @@ def print_cube(cubename, cube):
         print(']')
     print("Cube end: " + cubename)
 
+def piece_name(pieceid):
+    return "piece{0}".format(pieceid)
+
 def print_all_pieces():
-    for piecename, piece in pieces.items():
-        if piece != empty:
-            print_cube(piecename, piece)
+    for pieceid in voxelgrid.piece_ids(labels):
+        print_cube(piece_name(pieceid), voxelgrid.piece_cube(labels, pieceid))
 
-def makeunitcube(x, y, z):
+# one box of lx by ly by lz units, make_3mf recomputes once for the whole piece
+def makecuboid(x, y, z, lx, ly, lz):
     obj        = doc.addObject("Part::Box","Box")
     obj.Label  = "Box"
-    obj.Length = unitmm
-    obj.Width  = unitmm
-    obj.Height = unitmm
+    obj.Length = unitmm*lx
+    obj.Width  = unitmm*ly
+    obj.Height = unitmm*lz
     position = FreeCAD.Vector(unitmm*x, unitmm*y, unitmm*z)
     obj.Placement = FreeCAD.Placement(position, FreeCAD.Rotation(Vector(0,0,1),0))
-    doc.recompute()
     return obj
 
-# moves one cubeunit from fromcube to tocube
-def move(fromcube, tocube, x, y, z):
-    if fromcube[x][y][z] == 1 and tocube[x][y][z] == 0:
-        fromcube[x][y][z] = 0
-        tocube[x][y][z] = 1
-    else:
-        print("Error PC: problem in move")
-        quit()
-
-def move_unit(fromcube, pieceindex, x, y, z):
-        move(fromcube, pieces["piece{0}".format(pieceindex)], x, y, z)
-
-def count_units(piece):
-    count = 0
-    for x, X in enumerate(piece):
-        for y, Y in enumerate(X):
-            for z, Z in enumerate(Y):
-                if Z == 1:
-                    count += 1
-    return count
-
-print("Start:", count_units(full))
-
-def make_piece_x(piece):
-    # choose a random coordinate on this side
-    Y = random.randint(0, size - 1)
-    Z = random.randint(0, size - 1)
-    # remove longest length piece at coordinate
-    x = 0
-    if full[x][Y][Z] == 1:
-        move(full, piece, x, Y, Z)
-        for other_x in range(size - 1):
-            if full[x + other_x + 1][Y][Z] == 0:
-                return
-            elif full[x + other_x + 1][Y][Z] == 1:
-                move(full, piece, x + other_x + 1, Y, Z)
-
-def make_piece_y(piece):
-    # choose a random coordinate on this side
-    X = random.randint(0, size - 1)
-    Z = random.randint(0, size - 1)
-    # remove longest length piece at coordinate
-    y = 0
-    if full[X][y][Z] == 1:
-        move(full, piece, X, y, Z)
-        for other_y in range(size - 1):
-            if full[X][y + other_y + 1][Z] == 0:
-                return
-            elif full[X][y + other_y + 1][Z] == 1:
-                move(full, piece, X, y + other_y + 1, Z)
-
-def make_piece_z(piece):
-    # choose a random coordinate on this side
-    X = random.randint(0, size - 1)
-    Y = random.randint(0, size - 1)
-    # remove longest length piece at coordinate
-    z = 0
-    if full[X][Y][z] == 1:
-        move(full, piece, X, Y, z)
-        for other_z in range(size - 1):
-            if full[X][Y][z + other_z + 1] == 0:
-                return
-            elif full[X][Y][z + other_z + 1] == 1:
-                move(full, piece, X, Y, z + other_z + 1)
-
 
 def make_3mf(name, compound):
     cobj = doc.addObject("Part::Compound", name)
@@ -120,173 +66,72 @@ def make_3mf(name, compound):
     doc.recompute()
     export_list = []
     export_list.append(cobj)
-    Mesh.export(export_list, u"/home/paul/FreeCAD_generated/" + name + ".stl")
+    Mesh.export(export_list, export_directory + name + ".stl")
 
-def pieces_to_3mf(pieces):
-    for piecename, piece in pieces.items():
-        #print("piece:", piecename, "count:", count_units(piece))
+def pieces_to_3mf(labels):
+    for pieceid in voxelgrid.piece_ids(labels):
+        #print("piece:", piece_name(pieceid), "count:", int((labels == pieceid).sum()))
         compound_piece = []
-        for x, X in enumerate(piece):
-            for y, Y in enumerate(X):
-                for z, Z in enumerate(Y):
-                    if Z == 1:
-                        piecepart = makeunitcube(x,y,z)
-                        compound_piece.append(piecepart)
-        make_3mf(piecename, compound_piece)
-
-
-def unit_still_in_full(x, y, z):
-    if full[x][y][z] == 1:
-        return True
-    return False
-
-def find_smallest_piece(piecenamelist):
-    leastpieces = 999
-    leastname = ""
-    for piecename, piece in pieces.items():
-        if piecename in piecenamelist:
-            if len(piece) < leastpieces:
-                leastpieces = len(piece)
-                leastname = piecename
-    return leastname
-
-def move_unit_to_adjacent(x, y, z):
-    # find current adjacent pieces
-    adj = []
-    for piecename, piece in pieces.items():
-        if x >= 1: # X
-            tx = x - 1
-        else:
-            tx = x
-        if piece[tx][y][z] == 1:
-            if count_units(piece) <= maxsize:
-                adj.append(piecename)
-        if x == size - 1:
-            tx = x
-        else:
-            tx = x + 1
-        if piece[tx][y][z] == 1:
-            if count_units(piece) <= maxsize:
-                adj.append(piecename)
-        if y >= 1: # Y
-            ty = y - 1
-        else:
-            ty = y
-        if piece[x][ty][z] == 1:
-            if count_units(piece) <= maxsize:
-                adj.append(piecename)
-        if y == size - 1:
-            ty = y
-        else:
-            ty = y + 1
-        if piece[x][ty][z] == 1:
-            if count_units(piece) <= maxsize:
-                adj.append(piecename)
-        if z >= 1: # Z
-            tz = z - 1
-        else:
-            tz = z
-        if piece[x][y][tz] == 1:
-            if count_units(piece) <= maxsize:
-                adj.append(piecename)
-        if z == size - 1:
-            tz = z
-        else:
-            tz = z + 1
-        if piece[x][y][tz] == 1:
-            if count_units(piece) <= maxsize:
-                adj.append(piecename)
-    #print('adjacent are ' + str(adj))
-    # choose one of the adjacent pieces and attach to it
-    if adj != []:
-        smallest = find_smallest_piece(adj)
-        #move_unit(full, random.choice(adj)[5:], x, y, z)
-        move_unit(full, smallest[5:], x, y, z)
-    return
-
-
-for i in range(numpieces):
-    currentpiece = "piece{0}".format(i)
-    pieces[currentpiece] = [[[0 for kk in range(size)] for jj in range(size)] for ii in range(size)]
-    ## random x,y or z
-    ## create longest possible piece
-    choice = random.choice(["x", "y", "z"])
-    if choice == "x":
-        while (count_units(pieces[currentpiece]) < 3):
-            pieces[currentpiece] = [[[0 for kk in range(size)] for jj in range(size)] for ii in range(size)]
-            make_piece_x(pieces[currentpiece])
-    if choice == "y":
-        while (count_units(pieces[currentpiece]) < 3):
-            pieces[currentpiece] = [[[0 for kk in range(size)] for jj in range(size)] for ii in range(size)]
-            make_piece_y(pieces[currentpiece])
-    if choice == "z":
-        while (count_units(pieces[currentpiece]) < 3):
-            pieces[currentpiece] = [[[0 for kk in range(size)] for jj in range(size)] for ii in range(size)]
-            make_piece_z(pieces[currentpiece])
-
-print("Round 1:", count_units(full))
-
-# second round
-for x in range(size):
-    for y in range(size):
-        for z in range(size):
-            if unit_still_in_full(x,y,z):
-                move_unit_to_adjacent(x,y,z)
-
-print("Round 2:", count_units(full))
-
-# third round
-for x in range(size):
-    for y in range(size):
-        for z in range(size):
-            if unit_still_in_full(x,y,z):
-                move_unit_to_adjacent(x,y,z)
-
-print("Round 3:", count_units(full))
-
-
-# third round
-for x in range(size):
-    for y in range(size):
-        for z in range(size):
-            if unit_still_in_full(x,y,z):
-                move_unit_to_adjacent(x,y,z)
-
-print("Round 4:", count_units(full))
-
-
-# third round
-for x in range(size):
-    for y in range(size):
-        for z in range(size):
-            if unit_still_in_full(x,y,z):
-                move_unit_to_adjacent(x,y,z)
-
-print("Round 5:", count_units(full))
-
-
-# third round
-for x in range(size):
-    for y in range(size):
-        for z in range(size):
-            if unit_still_in_full(x,y,z):
-                move_unit_to_adjacent(x,y,z)
-
-print("Round 6:", count_units(full))
-
+        for x, y, z, lx, ly, lz in voxelgrid.cuboids(voxelgrid.piece_cube(labels, pieceid)):
+            piecepart = makecuboid(x, y, z, lx, ly, lz)
+            compound_piece.append(piecepart)
+        make_3mf(piece_name(pieceid), compound_piece)
+
+# writes every different shape straight to a binary .stl, without FreeCAD objects
+# congruent pieces share one .stl, print_list.txt says how many of each to print
+# the outside faces of every piece are moved inwards by clearance
+def pieces_to_stl(labels):
+    printlist = voxelmesh.export_pieces_stl(labels, export_directory, unitmm, piece_name, clearance, orient)
+    print("Exported:", len(printlist), "different shapes for", sum(count for name, count, pieceids in printlist), "pieces")
+
+
+# to try many seeds and keep the best puzzles, run outside FreeCAD:
+#   python3 puzzlegen.py space --size 6 --seeds 0:1000 --best 10
+if seed is None:
+    seed = random.randrange(2**32)
+print("Seed:", seed)
+
+# the units of the target shape, every other unit of the cube stays outside the puzzle
+mask = None
+if target_stl is not None:
+    mask = voxelize.voxelize_stl(target_stl, unitmm)
+    size = mask.shape[0]
+    print("Target:", target_stl, "size:", size, "units:", int(mask.sum()))
+
+# straight pieces first, then grow the pieces until no unit can be attached anymore
+labels, stats = puzzlegen.space_cube(size, numpieces, minsize, maxsize, seed, mask)
+print("Growth:", stats["waves"], "waves,", stats["visits"], "visits,", stats["attached"], "attached")
+print("Leftover:", stats["leftover"])
+print("Rebalance:", stats["merged"], "merged,", stats["new"], "new,", stats["split"], "split,", stats["oversized"], "oversized")
+numpieces = stats["numpieces"]
+
+# save the puzzle, python3 puzzlefile.py exports it again without generating
+puzzlefile.save(export_directory + "puzzle_" + str(seed) + ".npz", labels, seed, {"kind": "space", "size": size, "numpieces": numpieces, "minsize": minsize, "maxsize": maxsize, "unitmm": unitmm, "target": target_stl, "clearance": clearance, "orient": orient})
+
+# check that every piece is one solid of the right size
+for pieceid, problem in voxelgrid.check_pieces(labels, numpieces, minsize, maxsize):
+    if pieceid is None:
+        print("Problem:", problem)
+    else:
+        print("Problem:", piece_name(pieceid), problem)
 
+total, parts = puzzlegen.score(labels, numpieces, minsize, maxsize)
+print("Score:", round(total, 2), parts)
 
+# can the printed pieces be slid apart again
+result = disassembly.disassemble(labels)
+if result["possible"]:
+    print("Disassembly:", result["moves"], "moves")
+elif result["possible"] is None:
+    print("Disassembly: unknown, the search ran out of positions with pieces", [piece_name(pieceid) for pieceid in result["left"]])
+else:
+    print("Disassembly: locked pieces", [piece_name(pieceid) for pieceid in result["locked"]])
 
 
 ##### andersom doen
-dus bestaande pieces overlopen en daar telkens stukje aan toevoegen
-
-
-
-
+# dus bestaande pieces overlopen en daar telkens stukje aan toevoegen
 
 
 #print_all_pieces()
-pieces_to_3mf(pieces)
-
-
+pieces_to_stl(labels)
+#pieces_to_3mf(labels)  # FreeCAD boxes, when a B-rep model is needed
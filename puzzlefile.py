@@ -0,0 +1,86 @@
+"""
+puzzlefile.py -- Paul Cobbaut, 2026-10-17
+Saves a generated voxel puzzle (label cube, seed and parameters) to a small .npz file
+and loads it again, so pieces can be exported, meshed or scored without generating again:
+  python3 puzzlefile.py /home/paul/FreeCAD_generated/puzzle_471.npz --stl /home/paul/FreeCAD_generated/
+  python3 puzzlefile.py /home/paul/FreeCAD_generated/puzzle_471.npz --score --disassemble
+  python3 puzzlefile.py /home/paul/FreeCAD_generated/puzzle_471.npz --solutions 2
+"""
+
+import argparse
+import json
+
+import numpy as np
+import disassembly
+import exactcover
+import puzzlegen
+import voxelgrid
+import voxelmesh
+
+
+# params is a dict with at least kind ("space" or "puzzle"), size and unitmm, clearance and orient are optional
+def save(filename, labels, seed, params):
+    # the smallest integer type that holds every piece id, signed when there are OUTSIDE units
+    if labels.min() < 0:
+        dtype = np.int8 if labels.max() < 2**7 else np.int16 if labels.max() < 2**15 else np.int32
+    else:
+        dtype = np.uint8 if labels.max() < 2**8 else np.uint16 if labels.max() < 2**16 else np.int32
+    np.savez_compressed(filename, labels=labels.astype(dtype), seed=np.int64(seed), params=json.dumps(params))
+
+
+# returns the label cube, the seed and the parameters
+def load(filename):
+    with np.load(filename, allow_pickle=False) as data:
+        labels = data["labels"].astype(np.int32)
+        seed = int(data["seed"])
+        params = json.loads(str(data["params"]))
+    return labels, seed, params
+
+
+def piece_name(params, pieceid):
+    prefix = "blk" if params["kind"] == "puzzle" else "piece"
+    return prefix + str(pieceid)
+
+
+# writes every different shape once to directory as a binary .stl, returns the print list
+def export_stl(labels, params, directory):
+    return voxelmesh.export_pieces_stl(labels, directory, params["unitmm"], lambda pieceid: piece_name(params, pieceid), params.get("clearance", 0), params.get("orient", False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="export, mesh or score a saved voxel puzzle")
+    parser.add_argument("filename", help="a .npz file written by puzzlefile.save")
+    parser.add_argument("--stl", metavar="DIRECTORY", help="write every piece as .stl to this directory")
+    parser.add_argument("--score", action="store_true", help="print the score of puzzlegen.score")
+    parser.add_argument("--disassemble", action="store_true", help="check if the pieces can be slid apart")
+    parser.add_argument("--solutions", type=int, metavar="CAP", help="count the solutions up to CAP")
+    parser.add_argument("--max-nodes", type=int, default=200000, help="give up counting solutions after this many search steps")
+    parser.add_argument("--max-seconds", type=float, default=10, help="give up counting solutions after this many seconds")
+    args = parser.parse_args()
+    labels, seed, params = load(args.filename)
+    numpieces = params.get("numpieces", int(labels.max()))
+    print("Seed:", seed, "parameters:", params, "pieces:", len(voxelgrid.piece_ids(labels)))
+    if args.stl:
+        printlist = export_stl(labels, params, args.stl)
+        print("Written:", len(printlist), "different shapes for", sum(count for name, count, pieceids in printlist), "pieces")
+    if args.score:
+        total, parts = puzzlegen.score(labels, numpieces, params.get("minsize", 1), params.get("maxsize"))
+        print("Score:", round(total, 2), parts)
+    if args.disassemble:
+        result = disassembly.disassemble(labels)
+        if result["possible"]:
+            print("Disassembly:", result["moves"], "moves")
+        elif result["possible"] is None:
+            print("Disassembly: unknown, the search ran out of positions with pieces", [piece_name(params, pieceid) for pieceid in result["left"]])
+        else:
+            print("Disassembly: locked pieces", [piece_name(params, pieceid) for pieceid in result["locked"]])
+    if args.solutions:
+        result = exactcover.count_solutions(labels, args.solutions, args.max_nodes, args.max_seconds)
+        if result["solutions"] is None:
+            print("Solutions: unknown (at least", str(result["at_least"]) + ") after", result["nodes"], "search steps, the search ran out of steps or time")
+        else:
+            print("Solutions:", str(result["solutions"]) + ("+" if result["capped"] else ""), "in", result["nodes"], "search steps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+puzzlegen.py -- Paul Cobbaut, 2026-10-17
+Generates the voxel puzzles of make_puzzle_cubes.py and make_space_cubes.py without FreeCAD
+Every puzzle comes from an explicit seed, the same seed always gives the same puzzle
+Search mode tries many seeds on a process pool and keeps the best scoring puzzles:
+  python3 puzzlegen.py space --size 6 --seeds 0:1000 --best 10
+"""
+
+import argparse
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import disassembly
+import voxelgrid
+import voxelize
+
+# tries per side coordinate to find a free line for a new piece
+max_attempts = 4
+
+# weights for score(), a lower score is a better puzzle
+score_weights = {
+    "leftover": 100.0,  # per unit still in the full cube
+    "problems": 1000.0, # per problem found by voxelgrid.check_pieces
+    "variance": 1.0,    # variance of the piece sizes
+    "pieces": 1.0,      # per piece
+    "locked": 1000.0,   # per piece that cannot be slid out, only with disassemble=True, not when the search gave up
+}
+
+
+# the free units at the start of a line, from where the line enters the puzzle
+# returns (start, stop), start == stop when the line misses the puzzle or starts with a taken unit
+def first_run(labels, axis, A, B):
+    units = voxelgrid.line(labels, axis, A, B)
+    inside = np.flatnonzero(units != voxelgrid.OUTSIDE)
+    if len(inside) == 0:
+        return 0, 0
+    start = int(inside[0])
+    return start, start + voxelgrid.leading_run(units[start:] == voxelgrid.FULL)
+
+
+# takes the longest line of free units starting on one side of the cube
+# axis is "x", "y" or "z", returns True when a piece of at least minsize units was made
+def make_piece(labels, rng, pieceid, axis, minsize):
+    size = labels.shape[0]
+    # choose a random coordinate on this side
+    A = rng.randint(0, size - 1)
+    B = rng.randint(0, size - 1)
+    # remove longest length piece at coordinate
+    start, stop = first_run(labels, axis, A, B)
+    if stop - start < minsize:
+        return False
+    voxelgrid.assign(labels, voxelgrid.line_index(axis, A, B, start, stop), pieceid)
+    return True
+
+
+# make_space_cubes.py: numpieces straight pieces along a random axis,
+# then every leftover unit goes to its smallest adjacent piece with room,
+# what is still left over is shared out by voxelgrid.rebalance
+# mask (a boolean cube from voxelize.py) gives the puzzle another shape than a full cube
+# returns the label cube and the statistics of voxelgrid.grow and voxelgrid.rebalance,
+# stats["numpieces"] is the highest piece id after rebalancing
+def space_cube(size, numpieces, minsize, maxsize, seed, mask=None):
+    rng = random.Random(seed)
+    labels = voxelgrid.make_labels(size, mask)
+    for pieceid in range(1, numpieces + 1):
+        ## random x,y or z
+        ## create longest possible piece
+        # give up on this piece when no free line on this side is long enough
+        choice = rng.choice(voxelgrid.axes)
+        for attempt in range(max_attempts * size * size):
+            if make_piece(labels, rng, pieceid, choice, minsize):
+                break
+    scheduler = voxelgrid.AttachScheduler(labels, numpieces, maxsize)
+    stats = voxelgrid.grow(labels, scheduler.attach)
+    stats.update(voxelgrid.rebalance(labels, numpieces, minsize, maxsize))
+    return labels, stats
+
+
+# make_puzzle_cubes.py: every other z row is a piece,
+# then every leftover unit goes to a random piece next to it in the x or y direction,
+# pieces smaller than minsize and what is still left over are shared out by voxelgrid.rebalance
+# mask (a boolean cube from voxelize.py) gives the puzzle another shape than a full cube
+# returns the label cube and the statistics of voxelgrid.grow and voxelgrid.rebalance
+def puzzle_cube(size, seed, mask=None, minsize=3):
+    rng = random.Random(seed)
+    labels = voxelgrid.make_labels(size, mask)
+    numpieces = 0
+    # creates straight pieces but skips one every time
+    skip = True
+    for x in range(size):
+        for y in range(size):
+            if skip:
+                start, stop = first_run(labels, "z", x, y)
+                if start < stop:
+                    numpieces += 1
+                    voxelgrid.assign(labels, voxelgrid.line_index("z", x, y, start, stop), numpieces)
+                skip = False
+            else:
+                skip = True
+
+    def attach(x, y, z):
+        adj = voxelgrid.adjacent_pieces(labels, x, y, z, voxelgrid.directions[:4])
+        if adj == []:
+            return None
+        # choose one of the adjacent pieces and attach to it
+        pieceid = rng.choice(adj)
+        voxelgrid.assign(labels, (x, y, z), pieceid)
+        return pieceid
+
+    stats = voxelgrid.grow(labels, attach, voxelgrid.directions[:4])
+    stats.update(voxelgrid.rebalance(labels, numpieces, minsize))
+    return labels, stats
+
+
+# score of one puzzle, lower is better, returns the total and its parts
+# disassemble=True also runs disassembly.disassemble and counts the locked pieces,
+# a search that ran out of max_states positions locks no piece
+def score(labels, numpieces, minsize=1, maxsize=None, weights=score_weights, disassemble=False):
+    sizes = voxelgrid.piece_sizes(labels, numpieces)[1:]
+    sizes = sizes[sizes > 0]
+    parts = {
+        "leftover": voxelgrid.count_full(labels),
+        "problems": len(voxelgrid.check_pieces(labels, numpieces, minsize, maxsize)),
+        "variance": float(np.var(sizes)) if len(sizes) > 0 else 0.0,
+        "pieces": len(sizes),
+    }
+    if disassemble:
+        parts["locked"] = len(disassembly.disassemble(labels)["locked"])
+    total = sum(weights[name] * value for name, value in parts.items())
+    return total, parts
+
+
+# generates and scores the puzzle of one seed, runs in a worker process
+def evaluate_space_cube(size, numpieces, minsize, maxsize, disassemble, mask, seed):
+    labels, stats = space_cube(size, numpieces, minsize, maxsize, seed, mask)
+    total, parts = score(labels, stats["numpieces"], minsize, maxsize, disassemble=disassemble)
+    return total, seed, parts
+
+
+def evaluate_puzzle_cube(size, disassemble, mask, seed):
+    labels, stats = puzzle_cube(size, seed, mask)
+    numpieces = int(labels.max())
+    total, parts = score(labels, numpieces, 3, disassemble=disassemble)
+    return total, seed, parts
+
+
+# evaluate(seed) for every seed on a process pool, returns the best (score, seed, parts)
+def search(evaluate, seeds, best=10, processes=None):
+    seeds = list(seeds)
+    chunksize = max(1, len(seeds) // 64)
+    results = []
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for result in pool.map(evaluate, seeds, chunksize=chunksize):
+            results.append(result)
+            results.sort(key=lambda result: (result[0], result[1]))
+            del results[best:]
+    return results
+
+
+def parse_seeds(text):
+    if ":" in text:
+        first, last = text.split(":")
+        return range(int(first), int(last))
+    return [int(seed) for seed in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="search seeds for the best voxel puzzles")
+    parser.add_argument("kind", choices=["space", "puzzle"], help="make_space_cubes.py or make_puzzle_cubes.py")
+    parser.add_argument("--size", type=int, default=6)
+    parser.add_argument("--numpieces", type=int, help="space cubes only, default size * 3 + 4")
+    parser.add_argument("--minsize", type=int, default=3)
+    parser.add_argument("--maxsize", type=int, default=10)
+    parser.add_argument("--seeds", default="0:1000", help="first:last (last excluded) or a comma separated list")
+    parser.add_argument("--best", type=int, default=10)
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--disassemble", action="store_true", help="also score pieces that cannot be slid out")
+    parser.add_argument("--target", metavar="STL", help="a closed .stl to use as the shape of the puzzle, --size is then ignored")
+    parser.add_argument("--unitmm", type=float, default=10, help="size of one unit when voxelizing --target")
+    args = parser.parse_args()
+    mask = None
+    size = args.size
+    if args.target:
+        mask = voxelize.voxelize_stl(args.target, args.unitmm)
+        size = mask.shape[0]
+    if args.kind == "space":
+        numpieces = args.numpieces or (size * 3) + 4
+        evaluate = partial(evaluate_space_cube, size, numpieces, args.minsize, args.maxsize, args.disassemble, mask)
+    else:
+        evaluate = partial(evaluate_puzzle_cube, size, args.disassemble, mask)
+    for total, seed, parts in search(evaluate, parse_seeds(args.seeds), args.best, args.processes):
+        print("score", round(total, 2), "seed", seed, " ".join(name + " " + str(round(value, 2)) for name, value in parts.items()))
+
+
+if __name__ == "__main__":
+    main()
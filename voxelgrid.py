@@ -0,0 +1,491 @@
+"""
+voxelgrid.py -- Paul Cobbaut, 2026-10-17
+NumPy voxel grid for make_puzzle_cubes.py and make_space_cubes.py
+A cube is a size x size x size numpy array, indexed as cube[x, y, z]
+1 means the unit is in this cube, 0 means it is not
+All pieces of a puzzle live in one label cube: every unit holds the id
+of the piece it belongs to, or FULL (0) when it is still in the full cube,
+or OUTSIDE (-1) when the puzzle has another shape than a cube and the unit is not part of it
+"""
+
+import heapq
+
+import numpy as np
+
+axes = ("x", "y", "z")
+
+FULL = 0  # label of a unit that is not yet part of a piece
+OUTSIDE = -1  # label of a unit that is not part of the puzzle at all
+
+# the six directions to the adjacent units
+directions = ((-1, 0, 0), (1, 0, 0), (0, -1, 0), (0, 1, 0), (0, 0, -1), (0, 0, 1))
+
+
+# index for (part of) the line along axis through the other two coordinates a and b
+# for axis "x" a and b are y and z, for "y" they are x and z, for "z" they are x and y
+def line_index(axis, a, b, start=0, stop=None):
+    run = slice(start, stop)
+    if axis == "x":
+        return (run, a, b)
+    if axis == "y":
+        return (a, run, b)
+    if axis == "z":
+        return (a, b, run)
+    raise ValueError("axis must be x, y or z, not " + str(axis))
+
+
+# one line of the cube as a view, so changing the line changes the cube
+def line(cube, axis, a, b):
+    return cube[line_index(axis, a, b)]
+
+
+# number of units at the start of a line before the first hole
+def leading_run(units):
+    holes = np.flatnonzero(units == 0)
+    if len(holes) == 0:
+        return len(units)
+    return int(holes[0])
+
+
+# a label cube with every unit still in the full cube
+# mask (a boolean cube, see voxelize.py) gives another shape, units outside it are OUTSIDE
+def make_labels(size, mask=None):
+    labels = np.full((size, size, size), FULL, dtype=np.int32)
+    if mask is not None:
+        labels[~mask] = OUTSIDE
+    return labels
+
+
+def count_full(labels):
+    return int(np.count_nonzero(labels == FULL))
+
+
+# moves every unit selected by index (a tuple, slice or boolean mask) from the full cube to a piece
+def assign(labels, index, pieceid):
+    if not np.all(labels[index] == FULL):
+        raise ValueError("Error PC: problem in move")
+    labels[index] = pieceid
+
+
+# number of units per piece id, index 0 holds the units still in the full cube
+def piece_sizes(labels, numpieces):
+    return np.bincount(labels[labels != OUTSIDE], minlength=numpieces + 1)
+
+
+# ids of all pieces that have at least one unit
+def piece_ids(labels):
+    ids = np.unique(labels)
+    return [int(pieceid) for pieceid in ids[(ids != FULL) & (ids != OUTSIDE)]]
+
+
+# one piece as a 0/1 cube
+def piece_cube(labels, pieceid):
+    return (labels == pieceid).astype(np.uint8)
+
+
+# piece ids of the adjacent units of x, y, z, once for every side they touch
+def adjacent_pieces(labels, x, y, z, directions=directions):
+    size = labels.shape[0]
+    result = []
+    for dx, dy, dz in directions:
+        nx, ny, nz = x + dx, y + dy, z + dz
+        if 0 <= nx < size and 0 <= ny < size and 0 <= nz < size:
+            label = int(labels[nx, ny, nz])
+            if label != FULL and label != OUTSIDE:
+                result.append(label)
+    return result
+
+
+# coordinates of all units in a cube, in x, y, z loop order
+def units(cube):
+    return [tuple(unit) for unit in np.argwhere(cube).tolist()]
+
+
+# the adjacent coordinates of x, y, z that are inside the cube
+def neighbours(size, x, y, z, directions=directions):
+    result = []
+    for dx, dy, dz in directions:
+        nx, ny, nz = x + dx, y + dy, z + dz
+        if 0 <= nx < size and 0 <= ny < size and 0 <= nz < size:
+            result.append((nx, ny, nz))
+    return result
+
+
+
+# result[x, y, z] is cube[x + dx, y + dy, z + dz], or fill where that is outside the cube
+def shifted(cube, direction, fill=0):
+    result = np.full_like(cube, fill)
+    source = tuple(slice(max(d, 0), n + min(d, 0)) for n, d in zip(cube.shape, direction))
+    target = tuple(slice(max(-d, 0), n + min(-d, 0)) for n, d in zip(cube.shape, direction))
+    result[target] = cube[source]
+    return result
+
+
+# units still in the full cube that touch at least one piece
+def frontier(labels, directions=directions):
+    taken = (labels != FULL) & (labels != OUTSIDE)
+    touching = np.zeros(labels.shape, dtype=bool)
+    for direction in directions:
+        touching |= shifted(taken, direction)
+    return touching & (labels == FULL)
+
+
+# attaches leftover units to pieces until nothing changes anymore
+# attach(x, y, z) moves one unit to a piece and returns its id, or None when it cannot
+# only units on the frontier are visited, and a unit that could not be attached
+# is only visited again when one of its adjacent units was attached
+def grow(labels, attach, directions=directions):
+    size = labels.shape[0]
+    wave = units(frontier(labels, directions))
+    queued = np.zeros(labels.shape, dtype=bool)
+    for unit in wave:
+        queued[unit] = True
+    stats = {"waves": 0, "visits": 0, "attached": 0}
+    while wave != []:
+        stats["waves"] += 1
+        nextwave = []
+        for x, y, z in wave:
+            queued[x, y, z] = False
+            stats["visits"] += 1
+            if labels[x, y, z] != FULL or attach(x, y, z) is None:
+                continue
+            stats["attached"] += 1
+            for unit in neighbours(size, x, y, z, directions):
+                if labels[unit] == FULL and not queued[unit]:
+                    queued[unit] = True
+                    nextwave.append(unit)
+        wave = nextwave
+    stats["leftover"] = count_full(labels)
+    return stats
+
+
+# keeps the live size of every piece so leftover units can be attached
+# to the smallest adjacent piece that has room left
+class AttachScheduler:
+    def __init__(self, labels, numpieces, maxsize):
+        self.labels = labels
+        self.maxsize = maxsize
+        self.sizes = piece_sizes(labels, numpieces)
+
+    # smallest piece first, lowest id on a tie
+    def key(self, pieceid):
+        return (int(self.sizes[pieceid]), pieceid)
+
+    # a piece can take one more unit when it stays within maxsize
+    def eligible(self, pieceid):
+        return self.sizes[pieceid] < self.maxsize
+
+    # the smallest eligible piece next to x, y, z, or None
+    def smallest_adjacent(self, x, y, z):
+        adj = [pieceid for pieceid in adjacent_pieces(self.labels, x, y, z) if self.eligible(pieceid)]
+        if adj == []:
+            return None
+        return min(adj, key=self.key)
+
+    # moves x, y, z from the full cube to its smallest eligible adjacent piece
+    # returns the id of that piece, or None when no adjacent piece can take it
+    def attach(self, x, y, z):
+        pieceid = self.smallest_adjacent(x, y, z)
+        if pieceid is not None:
+            self.move(pieceid, x, y, z)
+        return pieceid
+
+    def move(self, pieceid, x, y, z):
+        assign(self.labels, (x, y, z), pieceid)
+        self.sizes[pieceid] += 1
+
+
+# connected parts per piece, all pieces at once
+# every unit starts with its own flat index and takes the lowest index of
+# the adjacent units of the same piece until nothing changes anymore
+# returns an array with the number of 6-connected parts for every piece id
+def count_parts(labels, numpieces):
+    taken = (labels != FULL) & (labels != OUTSIDE)
+    last = labels.size
+    parts = np.where(taken, np.arange(labels.size).reshape(labels.shape), last)
+    while True:
+        lowest = parts.copy()
+        for direction in directions:
+            same = shifted(labels, direction, FULL) == labels
+            lowest = np.where(same & taken, np.minimum(lowest, shifted(parts, direction, last)), lowest)
+        # pointer jumping: follow the lowest index of the lowest index
+        flat = np.append(lowest.ravel(), last)
+        lowest = flat[flat[lowest]]
+        if np.array_equal(lowest, parts):
+            break
+        parts = lowest
+    roots = taken & (parts == np.arange(labels.size).reshape(labels.shape))
+    return np.bincount(labels[roots], minlength=numpieces + 1)
+
+
+# checks every piece at once, returns a list of (pieceid, problem), empty when all pieces are fine
+# a piece must be one 6-connected solid with between minsize and maxsize units
+def check_pieces(labels, numpieces, minsize=1, maxsize=None):
+    problems = []
+    if labels.min() < OUTSIDE or labels.max() > numpieces:
+        problems.append((None, "piece ids outside 1.." + str(numpieces)))
+        return problems
+    sizes = piece_sizes(labels, numpieces)
+    parts = count_parts(labels, numpieces)
+    for pieceid in range(1, numpieces + 1):
+        if sizes[pieceid] == 0:
+            continue
+        if parts[pieceid] > 1:
+            problems.append((pieceid, "has " + str(parts[pieceid]) + " loose parts"))
+        if sizes[pieceid] < minsize:
+            problems.append((pieceid, "has " + str(sizes[pieceid]) + " units, less than " + str(minsize)))
+        if maxsize is not None and sizes[pieceid] > maxsize:
+            problems.append((pieceid, "has " + str(sizes[pieceid]) + " units, more than " + str(maxsize)))
+    return problems
+
+
+# disjoint sets of flat unit indices, with path halving and union by size
+class DisjointSet:
+    def __init__(self, count):
+        self.parent = list(range(count))
+        self.sizes = [1] * count
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # joins the sets of i and j, returns the root of the joined set
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return i
+        if self.sizes[i] < self.sizes[j]:
+            i, j = j, i
+        self.parent[j] = i
+        self.sizes[i] += self.sizes[j]
+        return i
+
+    def size(self, i):
+        return self.sizes[self.find(i)]
+
+
+# the pairs of flat indices of adjacent units that are both part of the puzzle
+def adjacent_pairs(labels):
+    index = np.arange(labels.size).reshape(labels.shape)
+    inside = labels != OUTSIDE
+    pairs = []
+    for axis in range(3):
+        first = tuple(slice(0, -1) if a == axis else slice(None) for a in range(3))
+        second = tuple(slice(1, None) if a == axis else slice(None) for a in range(3))
+        both = inside[first] & inside[second]
+        pairs.append(np.stack((index[first][both], index[second][both]), axis=1))
+    return np.concatenate(pairs)
+
+
+# the flat indices of the 6 neighbours of every unit of a cube of shape, as a list per unit,
+# -1 for a neighbour outside the cube
+def neighbour_table(shape):
+    index = np.arange(int(np.prod(shape))).reshape(shape)
+    table = np.stack([shifted(index, direction, -1).ravel() for direction in directions], axis=1)
+    return table.tolist()
+
+
+# flat indices of the units in free reached breadth first from start, at most limit of them
+# every unit that is reached is taken out of free, table is made by neighbour_table
+def breadth_first(free, table, start, limit=None):
+    free.discard(start)
+    order = [start]
+    if limit is None:
+        limit = len(free) + 1
+    for unit in order:
+        for n in table[unit]:
+            if len(order) >= limit:
+                return order
+            if n in free:
+                free.discard(n)
+                order.append(n)
+    return order
+
+
+# the connected parts of units, each as a list of flat indices
+def components(units, table):
+    free = set(units)
+    parts = []
+    while free:
+        parts.append(breadth_first(free, table, next(iter(free))))
+    return parts
+
+
+# cuts a connected group of units into connected parts of at most maxsize units
+# parts are peeled off one breadth first order that starts at a far end of the group, so every part
+# is connected, a loose rest smaller than minsize goes with the part that cut it off (it can only touch
+# that part) as long as the part stays within maxsize, a rest that falls apart is cut again per connected part
+# returns the list of parts, the first part is the one that is peeled off first
+def split(units, table, minsize, maxsize):
+    parts = []
+    todo = [list(units)]
+    while todo:
+        group = todo.pop()
+        if len(group) <= maxsize:
+            parts.append(group)
+            continue
+        target = -(-len(group) // -(-len(group) // maxsize))
+        sizes = sorted(range(min(minsize, maxsize), maxsize + 1), key=lambda count: (abs(count - target), -count))
+        # a unit at a far end (the last one reached from any unit) first, then every other unit
+        far = breadth_first(set(group), table, group[0])[-1]
+        best = None
+        found = False
+        for start in [far] + [unit for unit in group if unit != far]:
+            order = breadth_first(set(group), table, start)
+            for count in sizes:
+                rest = components(order[count:], table)
+                small = [unit for part in rest if len(part) < minsize for unit in part]
+                if count + len(small) <= maxsize:
+                    best = (order[:count] + small, [part for part in rest if len(part) >= minsize])
+                    found = True
+                    break
+                if best is None:
+                    best = (order[:count], rest)
+            if found:
+                break
+        part, rest = best
+        parts.append(part)
+        todo.extend(rest)
+    return parts
+
+
+# gives every unit still in the full cube, every loose part of a piece and every piece
+# smaller than minsize a place in a valid piece, after the growth rounds
+# leftover units are cut into connected new pieces of at most maxsize units, breadth first,
+# then the sets that are too small are merged, smallest first, into the smallest adjacent set
+# that stays within maxsize, a set that fits nowhere goes to its smallest adjacent set anyway
+# every piece over maxsize is cut into connected pieces of at most maxsize afterwards
+# returns a dict with merged (small sets merged), new (new pieces), split (pieces cut off by split),
+# oversized (pieces still over maxsize, always 0) and numpieces (the highest piece id), labels is changed in place
+def rebalance(labels, numpieces, minsize=1, maxsize=None):
+    if maxsize is None:
+        maxsize = labels.size
+    flat = labels.ravel().copy()
+    sets = DisjointSet(labels.size)
+    pairs = adjacent_pairs(labels)
+    # the connected parts of every piece
+    same = (flat[pairs[:, 0]] == flat[pairs[:, 1]]) & (flat[pairs[:, 0]] != FULL)
+    for i, j in pairs[same].tolist():
+        sets.union(i, j)
+    table = neighbour_table(labels.shape)
+    # every connected region of leftover units cut in chunks of about the same size, at most maxsize
+    leftover = set(np.flatnonzero(flat == FULL).tolist())
+    while leftover:
+        region = breadth_first(leftover, table, min(leftover))
+        chunks = -(-len(region) // maxsize)
+        free = set(region)
+        for start in region:
+            if start in free:
+                chunk = breadth_first(free, table, start, -(-len(region) // chunks))
+                for unit in chunk[1:]:
+                    sets.union(start, unit)
+    # every set keeps the piece id of its units, only the biggest part of a piece keeps its id
+    roots = {}
+    for unit in np.flatnonzero(flat != OUTSIDE).tolist():
+        roots.setdefault(sets.find(unit), unit)
+    pieceid = {}
+    biggest = {}
+    for root, unit in roots.items():
+        label = int(flat[unit])
+        if label != FULL and sets.size(root) > biggest.get(label, (0, None))[0]:
+            biggest[label] = (sets.size(root), root)
+    for label, (count, root) in biggest.items():
+        pieceid[root] = label
+    # the sets next to every set
+    adjacent = {root: set() for root in roots}
+    for i, j in pairs.tolist():
+        i, j = sets.find(i), sets.find(j)
+        if i != j:
+            adjacent[i].add(j)
+            adjacent[j].add(i)
+
+    stats = {"merged": 0, "new": 0, "split": 0, "oversized": 0}
+    heap = [(sets.size(root), root) for root in roots if sets.size(root) < minsize]
+    heapq.heapify(heap)
+    while heap != []:
+        count, root = heapq.heappop(heap)
+        if sets.find(root) != root or sets.size(root) != count or adjacent[root] == set():
+            continue
+        fits = [other for other in adjacent[root] if sets.size(other) + count <= maxsize]
+        if fits != []:
+            # a valid piece first, then the smallest
+            other = min(fits, key=lambda other: (sets.size(other) < minsize, sets.size(other), other))
+        else:
+            other = min(adjacent[root], key=lambda other: (sets.size(other), other))
+        stats["merged"] += 1
+        joined = sets.union(root, other)
+        gone = other if joined == root else root
+        # the id of the set that already was a piece wins
+        label = pieceid.pop(root, None)
+        label = pieceid.pop(other, label)
+        if label is not None:
+            pieceid[joined] = label
+        # every neighbour of the gone set points at the joined set instead,
+        # then the smaller adjacency set is merged into the bigger one
+        small, big = adjacent.pop(gone), adjacent[joined]
+        for neighbour in small:
+            if neighbour != joined:
+                adjacent[neighbour].discard(gone)
+                adjacent[neighbour].add(joined)
+        if len(small) > len(big):
+            small, big = big, small
+            adjacent[joined] = big
+        big |= small
+        big.discard(gone)
+        big.discard(joined)
+        if sets.size(joined) < minsize:
+            heapq.heappush(heap, (sets.size(joined), joined))
+    # new pieces for the sets without an id, then all units get the id of their set at once
+    for root in sorted(set(sets.find(root) for root in roots)):
+        if root not in pieceid:
+            numpieces += 1
+            pieceid[root] = numpieces
+            stats["new"] += 1
+    final = np.full(labels.size, OUTSIDE, dtype=labels.dtype)
+    for root, label in pieceid.items():
+        final[root] = label
+    units = np.flatnonzero(flat != OUTSIDE)
+    found = [sets.find(unit) for unit in units.tolist()]
+    flat[units] = final[found]
+    # every piece over maxsize, one that had to take a small set or one that was too long from the start,
+    # is cut into connected pieces of at most maxsize, the first part keeps the id
+    members = {}
+    for unit, root in zip(units.tolist(), found):
+        if sets.size(root) > maxsize:
+            members.setdefault(root, []).append(unit)
+    for root, group in members.items():
+        for part in split(group, table, minsize, maxsize)[1:]:
+            numpieces += 1
+            flat[part] = numpieces
+            stats["split"] += 1
+    labels[...] = flat.reshape(labels.shape)
+    stats["oversized"] = int(np.count_nonzero(piece_sizes(labels, numpieces) > maxsize))
+    stats["numpieces"] = numpieces
+    return stats
+
+
+# splits a piece (a 0/1 cube) into axis aligned boxes (x, y, z, lx, ly, lz)
+# every box starts at the first uncovered unit and grows along z, then y, then x
+# as long as the whole row or slab is still uncovered, so a piece needs only a few boxes
+def cuboids(cube):
+    free = cube != 0
+    size = free.shape
+    boxes = []
+    for x, y, z in units(free):
+        if not free[x, y, z]:
+            continue
+        z1 = z + 1
+        while z1 < size[2] and free[x, y, z1]:
+            z1 += 1
+        y1 = y + 1
+        while y1 < size[1] and free[x, y1, z:z1].all():
+            y1 += 1
+        x1 = x + 1
+        while x1 < size[0] and free[x1, y:y1, z:z1].all():
+            x1 += 1
+        free[x:x1, y:y1, z:z1] = False
+        boxes.append((x, y, z, x1 - x, y1 - y, z1 - z))
+    return boxes
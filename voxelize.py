@@ -0,0 +1,81 @@
+"""
+voxelize.py -- Paul Cobbaut, 2026-10-17
+Turns a closed .stl (binary or ascii) into a boolean cube to use as the shape of a puzzle
+A unit is inside when a ray from its centre along +z crosses the surface an odd number of times,
+the rays of all units are tested against the triangles with numpy, a chunk of triangles at a time
+"""
+
+import numpy as np
+
+# ray and triangle pairs per chunk, a chunk tests every ray against a few triangles at once
+chunk_tests = 2**21
+
+# the rays are moved a tiny bit off the unit centres so they never hit an edge or a corner
+# of two triangles exactly, that would count one crossing twice
+ray_offset = (1.234567e-4, 2.345678e-4)
+
+
+# returns the triangles of an .stl file as an (n, 3, 3) array
+def load_stl(filename):
+    with open(filename, "rb") as f:
+        data = f.read()
+    if len(data) >= 84:
+        count = int(np.frombuffer(data, dtype="<u4", count=1, offset=80)[0])
+        if len(data) == 84 + count * 50:
+            records = np.frombuffer(data, dtype=np.dtype([
+                ("normal", "<f4", (3,)),
+                ("vertices", "<f4", (3, 3)),
+                ("attribute", "<u2"),
+            ]), count=count, offset=84)
+            return records["vertices"].astype(np.float64)
+    # an ascii .stl: every "vertex x y z" line is one corner
+    words = data.decode("ascii", "replace").split()
+    corners = [words[i + 1:i + 4] for i, word in enumerate(words) if word == "vertex"]
+    return np.array(corners, dtype=np.float64).reshape(-1, 3, 3)
+
+
+# the units of a grid of unitmm units that lie inside the closed surface made by triangles
+# the grid starts at the lowest corner of the triangles and is padded to a cube,
+# returns the boolean cube (indexed as cube[x, y, z]) and its origin in mm
+def voxelize(triangles, unitmm):
+    origin = triangles.reshape(-1, 3).min(axis=0)
+    extent = triangles.reshape(-1, 3).max(axis=0) - origin
+    shape = np.maximum(np.ceil(extent / unitmm - 1e-9).astype(int), 1)
+    size = int(shape.max())
+    # the x, y position of every ray, one ray per column of units
+    gx, gy = np.meshgrid(np.arange(shape[0]), np.arange(shape[1]), indexing="ij")
+    rx = origin[0] + (gx.ravel() + 0.5 + ray_offset[0]) * unitmm
+    ry = origin[1] + (gy.ravel() + 0.5 + ray_offset[1]) * unitmm
+    # crossings[column, k] counts the crossings of a ray just below the centre of unit k
+    crossings = np.zeros((len(rx), shape[2] + 1), dtype=np.int64)
+    chunk = max(1, chunk_tests // len(rx))
+    for first in range(0, len(triangles), chunk):
+        t = triangles[first:first + chunk]
+        a, b, c = t[:, 0], t[:, 1], t[:, 2]
+        # twice the signed area in the x, y plane, skip triangles seen edge on
+        area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+        keep = np.abs(area) > 1e-12
+        a, b, c, area = a[keep], b[keep], c[keep], area[keep]
+
+        # edge functions of every ray (rows) against every triangle (columns)
+        def edge(p, q):
+            return (q[None, :, 0] - p[None, :, 0]) * (ry[:, None] - p[None, :, 1]) - (q[None, :, 1] - p[None, :, 1]) * (rx[:, None] - p[None, :, 0])
+        wa = edge(b, c) / area
+        wb = edge(c, a) / area
+        wc = edge(a, b) / area
+        hit = (wa >= 0) & (wb >= 0) & (wc >= 0)
+        rays, tris = np.nonzero(hit)
+        z = wa[rays, tris] * a[tris, 2] + wb[rays, tris] * b[tris, 2] + wc[rays, tris] * c[tris, 2]
+        # every unit with its centre above the crossing sees it
+        k = np.clip(np.ceil((z - origin[2]) / unitmm - 0.5).astype(int), 0, shape[2])
+        np.add.at(crossings, (rays, k), 1)
+    inside = (np.cumsum(crossings, axis=1)[:, :shape[2]] % 2 == 1).reshape(shape)
+    cube = np.zeros((size, size, size), dtype=bool)
+    cube[:shape[0], :shape[1], :shape[2]] = inside
+    return cube, origin
+
+
+# the shape of a closed .stl file as a boolean cube of unitmm units
+def voxelize_stl(filename, unitmm):
+    cube, origin = voxelize(load_stl(filename), unitmm)
+    return cube
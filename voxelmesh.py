@@ -0,0 +1,173 @@
+"""
+voxelmesh.py -- Paul Cobbaut, 2026-10-17
+Turns voxel pieces (0/1 numpy cubes from voxelgrid.py) straight into binary .stl files
+Only the faces on the outside of a piece are kept, and coplanar faces
+are merged greedily into big rectangles, no FreeCAD document is needed
+A clearance moves the outside faces of a piece inwards so printed pieces fit together,
+faces between two units of the same piece stay where they are
+"""
+
+import os
+
+import numpy as np
+import voxelgrid
+import voxelorient
+import voxelshapes
+
+# the six sides of a unit: (axis, +1 or -1)
+sides = ((0, -1), (0, 1), (1, -1), (1, 1), (2, -1), (2, 1))
+
+# one triangle in a binary .stl file
+stl_triangle = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("attribute", "<u2"),
+])
+
+
+# cover the True cells of a 2D mask with rectangles (u0, v0, u1, v1), end exclusive
+# every rectangle first grows along v, then along u as long as whole rows fit
+def greedy_rectangles(mask):
+    mask = mask.copy()
+    nu, nv = mask.shape
+    rectangles = []
+    for u0, v0 in np.argwhere(mask).tolist():
+        if not mask[u0, v0]:
+            continue
+        v1 = v0 + 1
+        while v1 < nv and mask[u0, v1]:
+            v1 += 1
+        u1 = u0 + 1
+        while u1 < nu and mask[u1, v0:v1].all():
+            u1 += 1
+        mask[u0:u1, v0:v1] = False
+        rectangles.append((u0, v0, u1, v1))
+    return rectangles
+
+
+# the faces of a piece that do not touch another unit of the same piece
+# returns a (side, exposed cube) pair for each of the six sides
+def exposed_faces(cube):
+    solid = cube != 0
+    result = []
+    for axis, sign in sides:
+        direction = [0, 0, 0]
+        direction[axis] = sign
+        result.append(((axis, sign), solid & ~voxelgrid.shifted(solid, direction)))
+    return result
+
+
+# all exposed faces of a piece merged into quads
+# a quad is (axis, sign, plane, u0, v0, u1, v1) where u and v are the two other axes in x, y, z order
+def piece_quads(cube):
+    quads = []
+    for (axis, sign), exposed in exposed_faces(cube):
+        layers = np.moveaxis(exposed, axis, 0)
+        for layer in np.flatnonzero(layers.any(axis=(1, 2))).tolist():
+            plane = layer + 1 if sign > 0 else layer
+            for u0, v0, u1, v1 in greedy_rectangles(layers[layer]):
+                quads.append((axis, sign, plane, u0, v0, u1, v1))
+    return quads
+
+
+# a piece shrunk on every outside face, for a clearance of less than half a unit
+# every unit is split in three bands per axis: [0, clearance], [clearance, unitmm - clearance] and [unitmm - clearance, unitmm]
+# a band next to a side of the unit is only kept when the unit on that side belongs to the piece too,
+# one axis after the other, so an outside corner loses all three bands and an inside corner none
+# returns a cube three times as big, to be meshed with band_coordinates
+def shrink(cube):
+    solid = cube != 0
+    for axis in range(3):
+        solid = np.repeat(solid, 3, axis=axis)
+    for axis in range(3):
+        before = [0, 0, 0]
+        before[axis] = -3
+        after = [0, 0, 0]
+        after[axis] = 3
+        band = np.arange(solid.shape[axis]) % 3
+        shape = [1, 1, 1]
+        shape[axis] = -1
+        band = band.reshape(shape)
+        solid = solid & ((band != 0) | voxelgrid.shifted(solid, before)) & ((band != 2) | voxelgrid.shifted(solid, after))
+    return solid
+
+
+# the position in mm of every band border of a cube shrunk with shrink()
+def band_coordinates(size, unitmm, clearance):
+    borders = np.arange(3 * size + 1)
+    offsets = np.array([0, clearance, unitmm - clearance])
+    return (borders // 3) * unitmm + offsets[borders % 3]
+
+
+# two triangles per quad, scaled to unitmm and wound so the normals point outwards
+# coordinates gives the mm of every grid line instead of unitmm, for a shrunk piece
+# returns the normals (n, 3) and the triangles (n, 3, 3)
+def quads_to_triangles(quads, unitmm, coordinates=None):
+    if quads == []:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3, 3), dtype=np.float32)
+    q = np.array(quads, dtype=np.int64)
+    axis, sign, plane = q[:, 0], q[:, 1], q[:, 2]
+    uaxis = np.where(axis == 0, 1, 0)
+    vaxis = np.where(axis == 2, 1, 2)
+    rows = np.arange(len(q))
+    corners = np.zeros((len(q), 4, 3), dtype=np.float64)
+    for corner, (u, v) in enumerate(((3, 4), (5, 4), (5, 6), (3, 6))):
+        corners[rows, corner, axis] = plane
+        corners[rows, corner, uaxis] = q[:, u]
+        corners[rows, corner, vaxis] = q[:, v]
+    normals = np.zeros((len(q), 3), dtype=np.float64)
+    normals[rows, axis] = sign
+    # u x v points along -y for the y axis, flip the corner order where needed
+    winding = np.cross(corners[:, 1] - corners[:, 0], corners[:, 3] - corners[:, 0])
+    flip = (winding * normals).sum(axis=1) < 0
+    corners[flip] = corners[flip][:, ::-1]
+    triangles = np.concatenate((corners[:, [0, 1, 2]], corners[:, [0, 2, 3]]))
+    if coordinates is None:
+        triangles = triangles * unitmm
+    else:
+        triangles = coordinates[triangles.astype(np.int64)]
+    return np.concatenate((normals, normals)).astype(np.float32), triangles.astype(np.float32)
+
+
+def write_stl(filename, normals, triangles, name="voxelmesh"):
+    data = np.zeros(len(triangles), dtype=stl_triangle)
+    data["normal"] = normals
+    data["vertices"] = triangles
+    header = name.encode("ascii", "replace")[:80].ljust(80, b" ")
+    with open(filename, "wb") as f:
+        f.write(header)
+        f.write(np.uint32(len(data)).tobytes())
+        f.write(data.tobytes())
+
+
+# write one piece (a 0/1 cube) to a binary .stl file, returns the number of triangles
+# clearance is in mm and is taken off every outside face of the piece
+def export_piece_stl(filename, cube, unitmm, name="voxelmesh", clearance=0):
+    if clearance > 0:
+        if clearance * 2 >= unitmm:
+            raise ValueError("Error PC: clearance must be less than half of unitmm")
+        coordinates = band_coordinates(max(cube.shape), unitmm, clearance)
+        normals, triangles = quads_to_triangles(piece_quads(shrink(cube)), unitmm, coordinates)
+    else:
+        normals, triangles = quads_to_triangles(piece_quads(cube), unitmm)
+    write_stl(filename, normals, triangles, name)
+    return len(triangles)
+
+
+# writes every different shape of a puzzle once to directory, congruent pieces share one .stl
+# piece_name(pieceid) gives the file name, print_list.txt says how many of each to print
+# orient=True turns every shape to the print orientation of voxelorient.best_orientation
+# returns the print list as (name, count, pieceids)
+def export_pieces_stl(labels, directory, unitmm, piece_name, clearance=0, orient=False):
+    printlist = []
+    for pieceids in voxelshapes.congruent_groups(labels):
+        name = piece_name(pieceids[0])
+        cube = voxelgrid.piece_cube(labels, pieceids[0])
+        if orient:
+            cube, rotation, parts = voxelorient.best_orientation(cube)
+        export_piece_stl(os.path.join(directory, name + ".stl"), cube, unitmm, name, clearance)
+        printlist.append((name, len(pieceids), pieceids))
+    with open(os.path.join(directory, "print_list.txt"), "w") as f:
+        for name, count, pieceids in printlist:
+            f.write(name + ".stl x" + str(count) + "  " + " ".join(piece_name(pieceid) for pieceid in pieceids) + "\n")
+    return printlist
@@ -0,0 +1,48 @@
+"""
+voxelorient.py -- Paul Cobbaut, 2026-10-17
+Chooses the print orientation of a voxel piece (a 0/1 numpy cube): the one of the 24 rotations
+of a cube that needs the least support, stands on the biggest footprint and prints the fastest
+All 24 rotations of a piece are scored at once, z is up and the build plate is at z = 0
+"""
+
+import numpy as np
+import voxelshapes
+
+# weights for orientation_scores(), a lower score is a better orientation
+orient_weights = {
+    "overhang": 10.0,   # per downward face above the build plate, it needs support
+    "footprint": -2.0,  # per face on the build plate, negative: a bigger footprint sticks better
+    "height": 1.0,      # per unit of height, more layers take more time
+}
+
+
+# scores every rotation of voxelshapes.rotations for one piece, lower is better
+# returns the totals (24,) and the parts as a dict of (24,) arrays
+def orientation_scores(cube, weights=orient_weights):
+    turned = voxelshapes.rotated_units(cube)
+    side = int(turned.max()) + 2
+    # one key per unit of every rotation, rotations never share a key
+    rotation = np.arange(len(turned))[:, None]
+    keys = ((rotation * side + turned[:, :, 0]) * side + turned[:, :, 1]) * side + turned[:, :, 2]
+    z = turned[:, :, 2]
+    # a unit above the build plate without a unit of the piece right below it hangs over
+    below = np.isin(keys - 1, keys)
+    parts = {
+        "overhang": np.count_nonzero((z > 0) & ~below, axis=1),
+        "footprint": np.count_nonzero(z == 0, axis=1),
+        "height": z.max(axis=1) + 1,
+    }
+    total = sum(weights[name] * value for name, value in parts.items())
+    return total, parts
+
+
+# the piece turned to its best print orientation, as a 0/1 cube just big enough to hold it
+# on a tie the first rotation wins, and that is the piece as it is in the puzzle
+# returns the turned cube, the rotation index and the parts of its score
+def best_orientation(cube, weights=orient_weights):
+    total, parts = orientation_scores(cube, weights)
+    best = int(np.argmin(total))
+    units = voxelshapes.rotated_units(cube)[best]
+    turned = np.zeros(tuple(units.max(axis=0) + 1), dtype=np.uint8)
+    turned[units[:, 0], units[:, 1], units[:, 2]] = 1
+    return turned, best, {name: int(value[best]) for name, value in parts.items()}
@@ -0,0 +1,66 @@
+"""
+voxelshapes.py -- Paul Cobbaut, 2026-10-17
+Recognizes congruent voxel pieces: pieces that are the same shape after one of the 24 rotations of a cube
+Mirror images are different pieces, a printed piece cannot be mirrored
+"""
+
+import hashlib
+import itertools
+
+import numpy as np
+import voxelgrid
+
+
+# the 24 rotation matrices of a cube: signed permutation matrices with determinant +1
+def make_rotations():
+    result = []
+    for permutation in itertools.permutations(range(3)):
+        for signs in itertools.product((1, -1), repeat=3):
+            matrix = np.zeros((3, 3), dtype=np.int64)
+            for row, (column, sign) in enumerate(zip(permutation, signs)):
+                matrix[row, column] = sign
+            if round(np.linalg.det(matrix)) == 1:
+                result.append(matrix)
+    return np.array(result)
+
+rotations = make_rotations()
+
+
+# the unit coordinates of a piece in all 24 rotations at once, shape (24, units, 3)
+# every rotation is moved to start at 0, 0, 0 and its units are sorted in x, y, z order
+def rotated_units(cube):
+    coordinates = np.argwhere(cube)
+    turned = np.einsum("rij,nj->rni", rotations, coordinates)
+    turned -= turned.min(axis=1, keepdims=True)
+    side = max(cube.shape)
+    keys = (turned[:, :, 0] * side + turned[:, :, 1]) * side + turned[:, :, 2]
+    order = np.argsort(keys, axis=1)
+    return np.take_along_axis(turned, order[:, :, None], axis=1)
+
+
+# the same for every rotation of the same piece: the smallest of the 24 sorted coordinate lists
+def canonical_units(cube):
+    turned = rotated_units(cube)
+    flat = turned.reshape(len(turned), -1)
+    best = 0
+    for r in range(1, len(flat)):
+        difference = np.flatnonzero(flat[r] != flat[best])
+        if len(difference) > 0 and flat[r, difference[0]] < flat[best, difference[0]]:
+            best = r
+    return turned[best]
+
+
+# a short text that is equal for two pieces exactly when they are congruent
+def shape_hash(cube):
+    units = canonical_units(cube)
+    return hashlib.sha1(units.astype(np.int16).tobytes()).hexdigest()[:16]
+
+
+# groups the piece ids of a label cube by shape, in the order their first piece appears
+# returns a list of lists of piece ids, one list per different shape
+def congruent_groups(labels):
+    groups = {}
+    for pieceid in voxelgrid.piece_ids(labels):
+        key = shape_hash(labels == pieceid)
+        groups.setdefault(key, []).append(pieceid)
+    return list(groups.values())